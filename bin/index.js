@@ -135,6 +135,7 @@ let BACKEND;
 let PKG_MGR_BK;
 let PKG_MGR_FD;
 let ENV_CHOICE;
+let ENGINE_MODE;
 let isTerminating;
 
 const terminate = async () => { // To be checked
@@ -379,15 +380,33 @@ const createBackend = async () => {
           ],
         })
         if (prompts.isCancel(ENV_CHOICE)) return cancel() 
+
+        // Ask for the MongoDB view mode. Async swaps in Quart (the Flask API on ASGI) with Motor and async def views
+        ENGINE_MODE = 'SYNC';
+        if (DATABASE === 'MONGODB') {
+          ENGINE_MODE = await prompts.select({
+            message: 'Which view mode do you want?',
+            options: [
+              {label: "Sync (Flask + PyMongo, threaded workers)", value: "SYNC"},
+              {label: "Async (Quart + Motor, async def views on an event loop)", value: "ASYNC"}
+            ],
+          })
+          if (prompts.isCancel(ENGINE_MODE)) return cancel()
+        }
         
         const flask_pkg = await dbConfigurations();
         const backendPath_fl = `.${PROJECT_PATH}/backend`;
+        const asyncPath_fl = join(TEMPLATES_DIR, 'backend', BACKEND, 'ASYNC', DATABASE);
 
          // 7. Copy template directory with it's contents based on selected database
          await runWithSpinner(
           whiteBright("COPYING TEMPLATE DIRECTORY"),
           async () => {
             await copyDirectory(join(TEMPLATES_DIR, 'backend', BACKEND, DATABASE), backendPath_fl);
+            if (ENGINE_MODE === 'ASYNC') { // Async files override their sync counterparts
+              await copyDirectory(asyncPath_fl, backendPath_fl);
+            }
+            await copyDirectory(join(TEMPLATES_DIR, 'backend', 'common'), backendPath_fl); // bench/ load-testing suite
           }
         );
 
@@ -395,7 +414,8 @@ const createBackend = async () => {
          await runWithSpinner(
           whiteBright("COPYING REQUIREMENTS.TXT"),
           async () => {
-            await copyFile(join(TEMPLATES_DIR, 'backend', BACKEND, DATABASE, 'requirements.txt'), `.${PROJECT_PATH}/backend/requirements.txt`);
+            const requirementsDir = ENGINE_MODE === 'ASYNC' ? asyncPath_fl : join(TEMPLATES_DIR, 'backend', BACKEND, DATABASE);
+            await copyFile(join(requirementsDir, 'requirements.txt'), `.${PROJECT_PATH}/backend/requirements.txt`);
           }
         );
 
@@ -429,15 +449,33 @@ const createBackend = async () => {
           ],
         })
         if (prompts.isCancel(ENV_CHOICE)) return cancel() 
+
+        // Ask for the SQLAlchemy engine mode. Async swaps in create_async_engine/AsyncSession and async def routes
+        ENGINE_MODE = 'SYNC';
+        if (DATABASE !== 'MONGODB') {
+          ENGINE_MODE = await prompts.select({
+            message: 'Which SQLAlchemy engine mode do you want?',
+            options: [
+              {label: "Sync (create_engine + threadpool routes)", value: "SYNC"},
+              {label: `Async (create_async_engine + ${DATABASE === 'POSTGRESQL' ? 'asyncpg' : 'aiomysql'})`, value: "ASYNC"}
+            ],
+          })
+          if (prompts.isCancel(ENGINE_MODE)) return cancel()
+        }
         
         const fastapi_pkg = await dbConfigurations();
         const backendPath_fa = `.${PROJECT_PATH}/backend`;
+        const asyncPath_fa = join(TEMPLATES_DIR, 'backend', BACKEND, 'ASYNC', DATABASE);
 
          // 7. Copy template directory with it's contents based on selected database
          await runWithSpinner(
           whiteBright("COPYING TEMPLATE DIRECTORY"),
           async () => {
             await copyDirectory(join(TEMPLATES_DIR, 'backend', BACKEND, DATABASE), backendPath_fa);
+            if (ENGINE_MODE === 'ASYNC') { // Async files override their sync counterparts
+              await copyDirectory(asyncPath_fa, backendPath_fa);
+            }
+            await copyDirectory(join(TEMPLATES_DIR, 'backend', 'common'), backendPath_fa); // bench/ load-testing suite
           }
         );
 
@@ -445,7 +483,8 @@ const createBackend = async () => {
          await runWithSpinner(
           whiteBright("COPYING REQUIREMENTS.TXT"),
           async () => {
-            await copyFile(join(TEMPLATES_DIR, 'backend', BACKEND, DATABASE, 'requirements.txt'), `.${PROJECT_PATH}/backend/requirements.txt`);
+            const requirementsDir = ENGINE_MODE === 'ASYNC' ? asyncPath_fa : join(TEMPLATES_DIR, 'backend', BACKEND, DATABASE);
+            await copyFile(join(requirementsDir, 'requirements.txt'), `.${PROJECT_PATH}/backend/requirements.txt`);
           }
         );
 
@@ -562,6 +601,7 @@ const createFrontend = async () => {
   console.log(dim(`For starting your project: 
   1) cd frontend && npm run dev
   2) ${BACKEND === 'NODEJS' ? 'cd backend && npm run dev' : 'After activating virtual environment,cd backend && run python main.py'}
+  ${BACKEND === 'NODEJS' ? '' : '   For production, set APP_ENV=production in backend/.env and run python serve.py (multi-worker gunicorn)'}
     `))
 
   console.log(whiteBright("Happy Coding!"))
@@ -0,0 +1,73 @@
+from sqlalchemy import insert, update, delete, select
+from sqlalchemy.exc import DBAPIError
+from pagination import valid_id
+
+# Bulk writes: one executemany INSERT/UPDATE (or one DELETE ... WHERE id IN) per request instead of
+# a transaction per entity. Each helper returns a per-item status list in the order items were sent.
+MAX_BULK_ITEMS = 1000
+
+async def _existing_ids(db, model, ids):
+    # Ids outside the INTEGER range match no row and would make the driver fail, so they stay out of
+    # the query and come back as not_found
+    return set(await db.scalars(select(model.id).where(model.id.in_([id_ for id_ in ids if valid_id(id_)]))))
+
+
+async def _replay(db, stmt, rows, ok_status):
+    # The batch hit a constraint or a value a column rejects (e.g. too long): rerun each row in its own
+    # SAVEPOINT to tell good rows from bad ones
+    results = []
+    for i, row in enumerate(rows):
+        try:
+            async with db.begin_nested():
+                await db.execute(stmt, [row])
+            results.append({"index": i, "status": ok_status})
+        except DBAPIError as e:
+            results.append({"index": i, "status": "error", "message": str(e.orig)})
+    await db.commit()
+    return results
+
+
+async def bulk_insert(db, model, rows):
+    try:
+        await db.execute(insert(model), rows)
+        await db.commit()
+    except DBAPIError:
+        await db.rollback()
+        return await _replay(db, insert(model), rows, "created")
+    return [{"index": i, "status": "created"} for i in range(len(rows))]
+
+
+async def bulk_update(db, model, rows):
+    ids = [row["id"] for row in rows]
+    found = await _existing_ids(db, model, ids)
+    to_update = [row for row in rows if row["id"] in found and len(row) > 1]
+    try:
+        if to_update:
+            await db.execute(update(model), to_update)  # ORM bulk UPDATE by primary key
+        await db.commit()
+    except DBAPIError:
+        await db.rollback()
+        replayed = iter(await _replay(db, update(model), to_update, "updated"))
+    else:
+        replayed = iter([{"status": "updated"}] * len(to_update))
+
+    results = []
+    for i, row in enumerate(rows):
+        if row["id"] not in found:
+            results.append({"index": i, "id": row["id"], "status": "not_found"})
+        elif len(row) == 1:
+            results.append({"index": i, "id": row["id"], "status": "invalid", "message": "No data provided"})
+        else:
+            results.append({**next(replayed), "index": i, "id": row["id"]})
+    return results
+
+
+async def bulk_delete(db, model, ids):
+    found = await _existing_ids(db, model, ids)
+    if found:
+        await db.execute(delete(model).where(model.id.in_(found)))
+    await db.commit()
+    return [
+        {"index": i, "id": id_, "status": "deleted" if id_ in found else "not_found"}
+        for i, id_ in enumerate(ids)
+    ]
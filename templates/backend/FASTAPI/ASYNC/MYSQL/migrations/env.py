@@ -0,0 +1,43 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from config import DATABASE_URL, Base
+import models  # registers the tables on Base.metadata
+
+config = context.config
+target_metadata = Base.metadata
+
+fileConfig(config.config_file_name)
+
+
+def run_migrations_offline():
+    # alembic upgrade head --sql: print the DDL instead of running it
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_with_connection(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations():
+    # Its own engine without a pool: a one-off run has no use for config.engine's pool settings
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(run_with_connection)
+    await engine.dispose()
+
+
+def run_migrations_online():
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,70 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
+from uuid import uuid4
+from dotenv import load_dotenv
+from metrics import TimedAsyncQueuePool, instrument_sqlalchemy
+from profiler import QUERY_PROFILER, profile_sqlalchemy
+import os
+
+load_dotenv()
+
+# Opt-in fast JSON: FAST_JSON=true makes orjson the default response encoder
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+# PostgreSQL connection via environment variables (async driver: asyncpg)
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "example_db")
+
+# DATABASE_URL, if set, replaces the DB_* settings (the bench/ stand-in points it at SQLite)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Connection pool tuning (see .env). pool_pre_ping costs a round trip on every checkout;
+# with DB_POOL_PRE_PING=false, pool_recycle alone guards against stale connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Set DB_EXTERNAL_POOL=true when an external pooler (PgBouncer in transaction mode) sits in front of the database.
+# SQLAlchemy then opens a connection per checkout (NullPool) and leaves pooling to it;
+# asyncpg's prepared statement cache is disabled because PgBouncer cannot route prepared statements.
+DB_EXTERNAL_POOL = os.getenv("DB_EXTERNAL_POOL", "false").lower() == "true"
+
+if DB_EXTERNAL_POOL:
+    engine_options = {
+        "poolclass": NullPool,
+        "connect_args": {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    }
+else:
+    engine_options = {
+        "poolclass": TimedAsyncQueuePool,  # times pool checkouts for /metrics
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# Statement count and latency for /metrics
+instrument_sqlalchemy()
+# Per-request statement counts and N+1 / slow query warnings in development (see profiler.py)
+if QUERY_PROFILER:
+    profile_sqlalchemy()
+engine = create_async_engine(DATABASE_URL, **engine_options)
+
+# expire_on_commit=False so objects stay usable after commit without another await
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,87 @@
+from fastapi import FastAPI, HTTPException, status
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from contextlib import asynccontextmanager
+import secrets
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from config import engine, SessionLocal, FAST_JSON
+from models import TableVersion
+from migrate import check_schema
+from routes import router
+from cache import ResponseCacheMiddleware, ConditionalGetMiddleware
+from metrics import MetricsMiddleware
+from profiler import QueryProfilerMiddleware
+from compression import CompressionMiddleware
+from admission import AdmissionMiddleware
+
+# Version tokens for conditional GET (ConditionalGetMiddleware in cache.py)
+async def bump_version(table):
+    etag = f'"{table}-{secrets.token_hex(8)}"'
+    stmt = update(TableVersion).where(TableVersion.name == table).values(etag=etag)
+    async with SessionLocal() as db:
+        if (await db.execute(stmt)).rowcount == 0:
+            try:
+                await db.execute(insert(TableVersion).values(name=table, etag=etag))
+            except IntegrityError:
+                # Another worker created the row first; overwrite its token instead
+                await db.rollback()
+                await db.execute(stmt)
+        await db.commit()
+    return etag
+
+async def read_version(table):
+    async with SessionLocal() as db:
+        version = await db.get(TableVersion, table)
+    # No row until the table's first write: a fixed token then, so a read never writes
+    return version.etag if version else f'"{table}-0"'
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is migrated once per deploy (migrate.py); a worker only checks the revision
+    await check_schema()
+    yield
+    await engine.dispose()
+
+app = FastAPI(
+    title="AutoStack API",
+    description="Full-stack API built with FastAPI and PostgreSQL (async SQLAlchemy)",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse
+)
+
+# Conditional GET (CONDITIONAL_GET in .env): 304 for unchanged list reads without touching the rows
+app.add_middleware(ConditionalGetMiddleware, read_version=read_version, bump_version=bump_version)
+
+# Response cache (CACHE_BACKEND in .env); added after conditional GET so a hit is served without
+# reading the version token, and before CORS so CORS headers also reach cached responses
+app.add_middleware(ResponseCacheMiddleware)
+
+# Development query profiler (QUERY_PROFILER in .env): Server-Timing header and N+1 / slow query warnings
+app.add_middleware(QueryProfilerMiddleware)
+
+# Response compression (COMPRESSION in .env); outside the cache layers, so cached bodies stay uncompressed
+app.add_middleware(CompressionMiddleware)
+
+# Admission control and rate limits (ADMISSION_CONTROL / RATE_LIMITS in .env): sheds excess requests
+# with 503 / 429 before any layer below touches the database
+app.add_middleware(AdmissionMiddleware)
+
+# Request metrics for /metrics; outside the cache layers so cache hits and 304s are counted too
+app.add_middleware(MetricsMiddleware, routes=router.routes)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Adjust this in production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.include_router(router)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("main:app", host="0.0.0.0", port=5000, reload=True)
\ No newline at end of file
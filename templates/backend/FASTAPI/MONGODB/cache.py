@@ -0,0 +1,315 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Read-through cache for the read endpoints. ResponseCacheMiddleware keeps the JSON bodies of the
+# GET routes in CACHED_READS, keyed by path and sorted query string, and serves them with an ETag
+# until they expire or a successful write to the same table invalidates them.
+# Invalidation bumps a per-table version that is part of every key, so stale entries are never
+# read again and just age out. CACHE_BACKEND=memory keeps entries and versions in each worker:
+# other workers may serve a stale page for up to CACHE_TTL seconds after a write.
+# CACHE_BACKEND=redis shares both between workers.
+#
+# ConditionalGetMiddleware is independent of the cache: it tags the same reads with a per-table
+# version token kept in the database and answers a matching If-None-Match with 304 from that
+# token alone, before the route queries or serializes anything.
+# The token costs one primary-key query per read, so it is off by default (CONDITIONAL_GET), and it
+# is checked behind the cache: a cache hit is served, or answered 304 by its own ETag, without
+# that query, and a table with no version row yet reads a fixed token instead of creating one.
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "none").lower()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_CONTROL = os.getenv("CACHE_CONTROL", "private, no-cache")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+KEY_PREFIX = "autostack"
+CONDITIONAL_GET = os.getenv("CONDITIONAL_GET", "false").lower() == "true"
+
+# GET routes whose responses are cached (and version-tagged), and the table each one reads.
+# A key ending in "/" stands for the single-item reads below it (/users/<id>).
+CACHED_READS = {
+    "/get-users": "users",
+    "/users": "users",
+    "/users/": "users",
+    "/get-notes": "notes",
+    "/notes": "notes",
+    "/notes/": "notes",
+    "/search-notes": "notes",
+}
+
+# Successful non-GET requests under these paths invalidate the table they write to
+WRITE_PREFIXES = {
+    "/create-user": "users",
+    "/update-users/": "users",
+    "/delete-user/": "users",
+    "/bulk/users": "users",
+    "/create-note": "notes",
+    "/update-notes/": "notes",
+    "/delete-note/": "notes",
+    "/bulk/notes": "notes",
+}
+
+
+def read_table(path):
+    # Two dict lookups: the path itself, then its parent for /users/<id>
+    return CACHED_READS.get(path) or CACHED_READS.get(path[:path.rfind("/") + 1])
+
+
+def written_table(path):
+    for prefix, table in WRITE_PREFIXES.items():
+        if path.startswith(prefix):
+            return table
+    return None
+
+
+class MemoryBackend:
+    # Per-process LRU of (value, expires_at) pairs; the least recently read entry is evicted first
+    name = "memory"
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.versions = {}
+
+    async def get(self, key):
+        item = self.entries.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl):
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def version(self, table):
+        return self.versions.get(table, 0)
+
+    async def bump(self, table):
+        self.versions[table] = self.versions.get(table, 0) + 1
+
+
+class RedisBackend:
+    # Shared cache in Redis (or any server speaking its protocol); entries expire through SET EX
+    name = "redis"
+
+    def __init__(self, url):
+        from redis import asyncio as aioredis
+        self.client = aioredis.from_url(url)
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(key, value, ex=ttl)
+
+    async def version(self, table):
+        return int(await self.client.get(f"{KEY_PREFIX}:{table}:version") or 0)
+
+    async def bump(self, table):
+        await self.client.incr(f"{KEY_PREFIX}:{table}:version")
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    async def key(self, table, path, query_string):
+        # Sorting the parameters makes ?limit=10&cursor=x and ?cursor=x&limit=10 share an entry
+        query = urlencode(sorted(parse_qsl(query_string)))
+        version = await self.backend.version(table)
+        return f"{KEY_PREFIX}:{table}:v{version}:{path}?{query}"
+
+    async def get(self, key):
+        # Stored as b'<etag>\n<body>' so both backends keep a single value per key
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, body = value.split(b"\n", 1)
+        return etag.decode(), body
+
+    async def set(self, key, body):
+        etag = make_etag(body)
+        await self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+        return etag
+
+    async def invalidate(self, table):
+        await self.backend.bump(table)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.enabled else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def create_backend():
+    if CACHE_BACKEND == "memory":
+        return MemoryBackend(CACHE_MAX_ENTRIES)
+    if CACHE_BACKEND == "redis":
+        return RedisBackend(REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(create_backend(), CACHE_TTL)
+
+
+def etag_matches(headers, etag):
+    if_none_match = headers.get(b"if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.decode().split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class ResponseCacheMiddleware:
+    # Pure ASGI middleware: serves cached reads, fills the cache on misses and invalidates on writes
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not response_cache.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        table = read_table(path) if scope["method"] == "GET" else None
+        if table is not None:
+            await self.read(scope, receive, send, table)
+            return
+
+        table = written_table(path) if scope["method"] != "GET" else None
+        if table is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_after_invalidating(message):
+            # Invalidate before the client sees the write succeed, so its next read is fresh
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                await response_cache.invalidate(table)
+            await send(message)
+
+        await self.app(scope, receive, send_after_invalidating)
+
+    async def read(self, scope, receive, send, table):
+        headers = dict(scope["headers"])
+        key = await response_cache.key(table, scope["path"], scope["query_string"].decode())
+        cached = await response_cache.get(key)
+        if cached is not None:
+            etag, body = cached
+            await self.respond(send, headers, etag, body, b"HIT")
+            return
+
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        if start["status"] != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = await response_cache.set(key, body)
+        await self.respond(send, headers, etag, body, b"MISS")
+
+    async def respond(self, send, request_headers, etag, body, cache_status):
+        response_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", CACHE_CONTROL.encode()),
+            (b"x-cache", cache_status),
+        ]
+        if etag_matches(request_headers, etag):
+            await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        response_headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class ConditionalGetMiddleware:
+    # read_version(table) and bump_version(table) are the database-specific coroutines from main.py.
+    # The token is read before the route runs, so a response is never newer-tagged than its rows;
+    # a write bumps it after commit, before the client sees the write succeed.
+    def __init__(self, app, read_version, bump_version):
+        self.app = app
+        self.read_version = read_version
+        self.bump_version = bump_version
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not CONDITIONAL_GET:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "GET":
+            table = read_table(scope["path"])
+        else:
+            table = written_table(scope["path"])
+        if table is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] != "GET":
+            async def send_after_bump(message):
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    await self.bump_version(table)
+                await send(message)
+
+            await self.app(scope, receive, send_after_bump)
+            return
+
+        etag = await self.read_version(table)
+        version_headers = [(b"etag", etag.encode()), (b"cache-control", CACHE_CONTROL.encode())]
+        if etag_matches(dict(scope["headers"]), etag):
+            await send({"type": "http.response.start", "status": 304, "headers": version_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_version(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                # Tags the route's 200 with the version token. With the response cache on, that cache is the
+                # outer middleware: it stores and sends its own body-hash ETag in place of this one, and a hit
+                # never reaches this layer, so clients see the version token only while the cache is off.
+                headers = [(name, value) for name, value in message["headers"] if name not in (b"etag", b"cache-control")]
+                message = {**message, "headers": headers + version_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
@@ -1,9 +1,15 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import TEXT, ReadPreference
 from dotenv import load_dotenv
+from metrics import CommandMetrics, PoolMetrics
+from profiler import QUERY_PROFILER, ProfilerCommandListener
 import os
 
 load_dotenv()
 
+# Opt-in fast JSON: FAST_JSON=true makes orjson the default response encoder
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
 # MongoDB connection via environment variables
 MONGO_USER = os.getenv("MONGO_USER", "")
 MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
@@ -16,11 +22,61 @@ if MONGO_USER and MONGO_PASSWORD:
 else:
     MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}"
 
-client = AsyncIOMotorClient(MONGO_URI)
+# Driver pool and timeout settings (see .env). minPoolSize keeps warm connections open so
+# traffic bursts don't pay for new handshakes; compressors are negotiated with the server.
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = os.getenv("MONGO_MAX_IDLE_TIME_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+# Read preference for the list/export endpoints only; writes and single-document reads stay on the primary
+MONGO_LIST_READ_PREFERENCE = os.getenv("MONGO_LIST_READ_PREFERENCE", "primary")
+if MONGO_LIST_READ_PREFERENCE not in READ_PREFERENCES:
+    raise ValueError(
+        f"MONGO_LIST_READ_PREFERENCE must be one of {', '.join(READ_PREFERENCES)}, not {MONGO_LIST_READ_PREFERENCE!r}"
+    )
+
+client_options = {
+    "maxPoolSize": MONGO_MAX_POOL_SIZE,
+    "minPoolSize": MONGO_MIN_POOL_SIZE,
+    "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+}
+if MONGO_MAX_IDLE_TIME_MS:
+    client_options["maxIdleTimeMS"] = int(MONGO_MAX_IDLE_TIME_MS)
+if MONGO_COMPRESSORS:
+    client_options["compressors"] = MONGO_COMPRESSORS
+# Command latency and pool checkout time for /metrics
+client_options["event_listeners"] = [CommandMetrics(), PoolMetrics()]
+# Per-request command counts and N+1 / slow command warnings in development (see profiler.py)
+if QUERY_PROFILER:
+    client_options["event_listeners"].append(ProfilerCommandListener())
+
+client = AsyncIOMotorClient(MONGO_URI, **client_options)
 database = client[MONGO_DB]
+read_database = client.get_database(MONGO_DB, read_preference=READ_PREFERENCES[MONGO_LIST_READ_PREFERENCE])
 
 users_collection = database.get_collection("users")
 notes_collection = database.get_collection("notes")
+users_read_collection = read_database.get_collection("users")
+notes_read_collection = read_database.get_collection("notes")
+# Per-collection version tokens for conditional GET (see main.py)
+versions_collection = database.get_collection("table_versions")
+
+# Unique indexes enforce uniqueness in the database (no find-before-insert) and make lookups O(log n).
+# create_index is a no-op when the index already exists, so this is safe on every startup.
+async def ensure_indexes():
+    await users_collection.create_index("username", unique=True)
+    await users_collection.create_index("email", unique=True)
+    await notes_collection.create_index("title", unique=True)
+    # One text index per collection: /search-notes runs $text on it, title matches weighted above content
+    await notes_collection.create_index([("title", TEXT), ("content", TEXT)], weights={"title": 10, "content": 1}, name="notes_text")
 
 async def get_database():
     return database
\ No newline at end of file
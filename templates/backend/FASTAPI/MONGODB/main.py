@@ -1,21 +1,61 @@
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
-from config import engine, Base
+import secrets
+from config import client, ensure_indexes, versions_collection, FAST_JSON
 from routes import router
+from cache import ResponseCacheMiddleware, ConditionalGetMiddleware
+from metrics import MetricsMiddleware
+from profiler import QueryProfilerMiddleware
+from compression import CompressionMiddleware
+from admission import AdmissionMiddleware
+
+# Version tokens for conditional GET (ConditionalGetMiddleware in cache.py)
+async def bump_version(table):
+    etag = f'"{table}-{secrets.token_hex(8)}"'
+    await versions_collection.update_one({"_id": table}, {"$set": {"etag": etag}}, upsert=True)
+    return etag
+
+async def read_version(table):
+    version = await versions_collection.find_one({"_id": table})
+    # No row until the table's first write: a fixed token then, so a read never writes
+    return version["etag"] if version else f'"{table}-0"'
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    await ensure_indexes()
     yield
+    client.close()
 
 app = FastAPI(
     title="AutoStack API",
-    description="Full-stack API built with FastAPI and MySQL",
+    description="Full-stack API built with FastAPI and MongoDB",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse
 )
 
+# Conditional GET (CONDITIONAL_GET in .env): 304 for unchanged list reads without touching the rows
+app.add_middleware(ConditionalGetMiddleware, read_version=read_version, bump_version=bump_version)
+
+# Response cache (CACHE_BACKEND in .env); added after conditional GET so a hit is served without
+# reading the version token, and before CORS so CORS headers also reach cached responses
+app.add_middleware(ResponseCacheMiddleware)
+
+# Development query profiler (QUERY_PROFILER in .env): Server-Timing header and N+1 / slow query warnings
+app.add_middleware(QueryProfilerMiddleware)
+
+# Response compression (COMPRESSION in .env); outside the cache layers, so cached bodies stay uncompressed
+app.add_middleware(CompressionMiddleware)
+
+# Admission control and rate limits (ADMISSION_CONTROL / RATE_LIMITS in .env): sheds excess requests
+# with 503 / 429 before any layer below touches the database
+app.add_middleware(AdmissionMiddleware)
+
+# Request metrics for /metrics; outside the cache layers so cache hits and 304s are counted too
+app.add_middleware(MetricsMiddleware, routes=router.routes)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Prometheus metrics, served at /metrics (see routes.py). Under gunicorn every worker writes its
+# samples to PROMETHEUS_MULTIPROC_DIR (set up in gunicorn.conf.py) and /metrics merges them, so a
+# scrape sees the whole server no matter which worker answers it.
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum")
+REJECTED = Counter("http_requests_rejected_total", "Requests turned away by admission control", ["pool", "reason"])
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Database command latency", ["operation"], buckets=DB_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool, including opening new ones",
+    buckets=DB_BUCKETS
+)
+
+
+def render_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def route_label(scope, routes):
+    # Label by route template (/update-users/{user_id}) so ids don't explode the series count.
+    # Requests answered by an outer middleware (cache hit, 304) never reach the router, so match here.
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        for route in routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return route.path
+        return "unmatched"
+    return path
+
+
+class MetricsMiddleware:
+    # Pure ASGI middleware: request count, latency and in-flight gauge for every HTTP request
+    # routes: the APIRouter routes from routes.py, used to label requests the router never saw
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_label(scope, self.routes)
+            REQUEST_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
+            REQUESTS.labels(scope["method"], route, str(status)).inc()
+            IN_FLIGHT.dec()
+
+
+# PyMongo: command and pool-checkout timing through driver listeners (Motor runs on PyMongo).
+# config.py passes them to the client as event_listeners.
+class CommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        DB_QUERY_LATENCY.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        DB_QUERY_LATENCY.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    # Checkouts happen synchronously on the calling thread, so a thread-local start time is enough
+    def __init__(self):
+        self.local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self.local.start = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        DB_POOL_WAIT.observe(time.perf_counter() - self.local.start)
+
+    def connection_check_out_failed(self, event):
+        DB_POOL_WAIT.observe(time.perf_counter() - self.local.start)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
@@ -0,0 +1,57 @@
+import base64
+import binascii
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+# Keyset pagination: clients pass back the opaque cursor from the previous page
+# and we resume with {"_id": {"$gt": last_id}} sorted by _id, which walks the default _id index.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        last_id = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (ValueError, binascii.Error):
+        last_id = None
+    if not last_id or not ObjectId.is_valid(last_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return ObjectId(last_id)
+
+
+# Batch reads: ?ids=a,b,c with at most MAX_PAGE_SIZE ids. Repeats are dropped and the response
+# keeps the order the ids were asked for in.
+def decode_ids(ids):
+    values = ids.split(",")
+    if not all(ObjectId.is_valid(value) for value in values):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid id"
+        )
+    if len(values) > MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_PAGE_SIZE} ids per request"
+        )
+    return [ObjectId(value) for value in dict.fromkeys(values)]
+
+# Documents are fetched with limit + 1 so we know whether another page exists without a count
+def paginate(docs, limit, key):
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(key(docs[-1]))
+    return docs, None
+
+
+# Lines the documents of an _id $in query up with the requested ids: (docs, missing ids)
+def order_by_ids(ids, items, key):
+    by_id = {key(item): item for item in items}
+    return [by_id[id_] for id_ in ids if id_ in by_id], [id_ for id_ in ids if id_ not in by_id]
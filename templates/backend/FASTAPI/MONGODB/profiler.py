@@ -0,0 +1,107 @@
+import logging
+import os
+from collections import Counter
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from pymongo import monitoring
+
+load_dotenv()
+
+# Development query profiler: counts the commands each request runs, flags commands repeated
+# N_PLUS_ONE_THRESHOLD or more times (typically a lookup inside a per-document loop) and commands
+# slower than SLOW_QUERY_MS, adds a Server-Timing header and logs a warning for flagged requests.
+# On by default with APP_ENV=development; QUERY_PROFILER overrides it either way.
+APP_ENV = os.getenv("APP_ENV", "development")
+QUERY_PROFILER = (os.getenv("QUERY_PROFILER") or str(APP_ENV == "development")).lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+logger = logging.getLogger("autostack.profiler")
+
+# The profile of the request being served. Driver events fire on Motor's worker threads, which get
+# a copy of the context: they mutate this object, they never rebind it.
+current_profile = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.statements = Counter()
+        self.slow = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            self.slow.append((statement, seconds))
+
+    def repeated(self):
+        return [(statement, n) for statement, n in self.statements.items() if n >= N_PLUS_ONE_THRESHOLD]
+
+    def server_timing(self):
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+    def report(self, method, path):
+        repeated = self.repeated()
+        if not repeated and not self.slow:
+            logger.debug("%s %s: %d queries in %.2f ms", method, path, self.count, self.seconds * 1000)
+            return
+        lines = [f"{method} {path}: {self.count} queries in {self.seconds * 1000:.2f} ms"]
+        for statement, n in repeated:
+            lines.append(f"  possible N+1, ran {n}x: {statement}")
+        for statement, seconds in self.slow:
+            lines.append(f"  slow ({seconds * 1000:.2f} ms): {statement}")
+        logger.warning("\n".join(lines))
+
+
+# PyMongo (Motor runs on it and copies the context into its threads): a command is identified by
+# its name, collection and filter keys, so a find by _id issued once per document shows up as the
+# same command repeated. config.py passes this listener to the client when QUERY_PROFILER is on.
+class ProfilerCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self.shapes = {}
+
+    def started(self, event):
+        if current_profile.get() is None:
+            return
+        shape = f"{event.command_name} {event.command.get(event.command_name)}"
+        keys = sorted(event.command.get("filter") or {})
+        self.shapes[event.request_id] = f"{shape} {keys}" if keys else shape
+
+    def succeeded(self, event):
+        shape = self.shapes.pop(event.request_id, None)
+        profile = current_profile.get()
+        if shape is not None and profile is not None:
+            profile.record(shape, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.shapes.pop(event.request_id, None)
+
+
+class QueryProfilerMiddleware:
+    # Pure ASGI middleware: one RequestProfile per HTTP request
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_PROFILER:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            profile.report(scope["method"], scope["path"])
@@ -0,0 +1,18 @@
+from fastapi import HTTPException, status
+
+# Field selection: ?fields=id,username on the list and export routes returns only those fields.
+# They become a find() projection ({"_id": 1, "username": 1}), so MongoDB sends back only those
+# fields and less BSON is decoded per document. Without fields= whole documents are returned.
+# id is always included: the next page cursor is built from it.
+def select_projection(schema, fields):
+    if not fields:
+        return None
+    names = list(schema.model_fields)
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    unknown = requested - set(names)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return {"_id" if name == "id" else name: 1 for name in names if name == "id" or name in requested}
@@ -0,0 +1,80 @@
+import os
+from functools import lru_cache
+from typing import Annotated, Union, get_args, get_origin
+from dotenv import load_dotenv
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+load_dotenv()
+
+# JSON for the list, batch and single-item read routes. A route declares its response model
+# (schemas.py) for the OpenAPI docs and returns json_response(Model, content), where content holds
+# documents as Motor returned them. That skips FastAPI's own handling of a returned value
+# (jsonable_encoder or a validate / serialize round trip, then json.dumps).
+#
+# RESPONSE_SERIALIZER picks the serializer. Both send only the fields the response model declares:
+#   pydantic (default): the response model validates the documents (_id becomes id, ObjectIds strings)
+#     and model_dump_json writes the JSON
+#   msgspec: _id is renamed to id and ObjectIds turned into strings by msgspec.to_builtins, then the
+#     documents are converted to Structs generated from the same models, which drops undeclared
+#     fields, and written by msgspec's encoder; faster on large pages (python -m bench.serialize)
+RESPONSE_SERIALIZER = os.getenv("RESPONSE_SERIALIZER", "pydantic").lower()
+
+
+def pydantic_json(model, content):
+    # exclude_unset leaves out the fields ?fields= did not select
+    return model.model_validate(content).model_dump_json(exclude_unset=True)
+
+
+def is_model(annotation):
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def rename_ids(annotation, value):
+    # value with _id renamed to id in every document, following the response model's shape
+    if get_origin(annotation) is list:
+        if is_model(get_args(annotation)[0]):
+            for document in value:
+                document["id"] = document.pop("_id")
+        return value
+    if is_model(annotation):
+        if "_id" in value:
+            value["id"] = value.pop("_id")
+            return value
+        return {name: rename_ids(field.annotation, value[name]) for name, field in annotation.model_fields.items()}
+    return value
+
+
+@lru_cache(maxsize=None)
+def struct_type(annotation):
+    # The msgspec type for a pydantic annotation: models become Structs with the same fields, and a
+    # field with a default is omitted from the JSON while unset, like exclude_unset above
+    import msgspec
+    if is_model(annotation):
+        fields = [
+            (name, struct_type(field.annotation)) if field.is_required()
+            else (name, Union[struct_type(field.annotation), msgspec.UnsetType], msgspec.UNSET)
+            for name, field in annotation.model_fields.items()
+        ]
+        return msgspec.defstruct(annotation.__name__, fields, omit_defaults=True)
+    args = get_args(annotation)
+    if get_origin(annotation) is Annotated:
+        return struct_type(args[0])  # ObjectIdStr: a plain str once to_builtins has run
+    if not args:
+        return annotation
+    args = tuple(struct_type(arg) for arg in args)
+    return Union[args] if get_origin(annotation) is not list else list[args[0]]
+
+
+def msgspec_json(model, content):
+    import msgspec
+    builtins = msgspec.to_builtins(rename_ids(model, content), enc_hook=str)
+    return msgspec.json.encode(msgspec.convert(builtins, struct_type(model)))
+
+
+SERIALIZERS = {"pydantic": pydantic_json, "msgspec": msgspec_json}
+serialize = SERIALIZERS.get(RESPONSE_SERIALIZER, pydantic_json)
+
+
+def json_response(model, content):
+    return Response(serialize(model, content), media_type="application/json")
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from typing import List
+import json
 from bson import ObjectId
-from config import users_collection, notes_collection
+from pymongo.errors import DuplicateKeyError
+from config import users_collection, notes_collection, users_read_collection, notes_read_collection
+from bulk import MAX_BULK_ITEMS, bulk_insert, bulk_update, bulk_delete
+from cache import response_cache
+from metrics import CONTENT_TYPE_LATEST, render_metrics
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, decode_ids, order_by_ids, paginate
+from projection import select_projection
+from responses import json_response
+from search import MAX_QUERY_LENGTH, decode_offset, search_cursor, search_page
 from schemas import (
-    UserCreate, UserUpdate, UserResponse,
-    NoteCreate, NoteUpdate, NoteResponse
+    UserCreate, UserUpdate, UserBulkUpdate, UserResponse, UserPage, UserBatch,
+    NoteCreate, NoteUpdate, NoteBulkUpdate, NoteResponse, NotePage, NoteBatch,
+    BulkDelete
 )
 
 router = APIRouter()
 
+EXPORT_BATCH_SIZE = 1000
+
 # Convert ObjectId to string
 def serialize_doc(doc):
     if doc and "_id" in doc:
@@ -16,6 +29,29 @@ def serialize_doc(doc):
         del doc["_id"]
     return doc
 
+# Streams a collection as NDJSON straight off the Motor cursor, flushing every EXPORT_BATCH_SIZE docs
+async def export_ndjson(collection, projection=None):
+    buffer = []
+    async for doc in collection.find({}, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE):
+        buffer.append(json.dumps(serialize_doc(doc)) + "\n")
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+def check_bulk_size(items):
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No data provided"
+        )
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_ITEMS} items per bulk request"
+        )
+
 @router.get("/", status_code=status.HTTP_200_OK)
 async def autostack():
     message = """ 
@@ -25,33 +61,81 @@ async def autostack():
 """
     return {"message": message, "backend": "FastAPI", "database": "MongoDB", "filepath": 'backend/main.py'}
 
+
+@router.get("/cache-stats", status_code=status.HTTP_200_OK)
+async def cache_stats():
+    # Hit/miss counters of this worker process
+    return response_cache.stats()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus text format; merges all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set.
+    # A plain def, so reading the per-worker files happens in the threadpool.
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Example User REST APIs
-@router.get("/get-users", status_code=status.HTTP_200_OK)
-async def get_users():
-    users = []
-    async for user in users_collection.find():
-        users.append(serialize_doc(user))
-    return {"users": users}
+@router.get("/get-users", response_model=UserPage, status_code=status.HTTP_200_OK)
+async def get_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None
+):
+    query = {}
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+    projection = select_projection(UserResponse, fields)
+    docs = await users_read_collection.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    docs, next_cursor = paginate(docs, limit, lambda doc: doc["_id"])
+    return json_response(UserPage, {"users": docs, "next_cursor": next_cursor})
+
+
+@router.get("/export-users", status_code=status.HTTP_200_OK)
+async def export_users(fields: str | None = None):
+    projection = select_projection(UserResponse, fields)
+    return StreamingResponse(export_ndjson(users_read_collection, projection), media_type="application/x-ndjson")
+
+
+@router.get("/users/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
+async def get_user(user_id: str):
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user ID"
+        )
+    # find_one on _id is a point lookup on the default _id index
+    doc = await users_collection.find_one({"_id": ObjectId(user_id)})
+    if doc is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return json_response(UserResponse, doc)
+
+
+@router.get("/users", response_model=UserBatch, status_code=status.HTTP_200_OK)
+async def get_users_by_ids(ids: str, fields: str | None = None):
+    # One {"_id": {"$in": [...]}} query for the whole batch; items come back in the order of ?ids=
+    user_ids = decode_ids(ids)
+    projection = select_projection(UserResponse, fields)
+    docs = await users_collection.find({"_id": {"$in": user_ids}}, projection).to_list(length=len(user_ids))
+    docs, missing = order_by_ids(user_ids, docs, lambda doc: doc["_id"])
+    return json_response(UserBatch, {"users": docs, "missing": missing})
 
 
 @router.post("/create-user", status_code=status.HTTP_201_CREATED)
 async def create_user(user: UserCreate):
-    existing = await users_collection.find_one({
-        "$or": [
-            {"username": user.username},
-            {"email": user.email}
-        ]
-    })
-    
-    if existing:
+    user_dict = user.model_dump()
+    try:
+        result = await users_collection.insert_one(user_dict)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this username or email already exists"
         )
     
-    user_dict = user.model_dump()
-    result = await users_collection.insert_one(user_dict)
-    
     if result.inserted_id:
         return {"message": "New User Created"}
     
@@ -76,10 +160,16 @@ async def update_user(user_id: str, user_data: UserUpdate):
             detail="No data provided"
         )
     
-    result = await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": update_data}
-    )
+    try:
+        result = await users_collection.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$set": update_data}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this username or email already exists"
+        )
     
     if result.matched_count == 0:
         raise HTTPException(
@@ -110,28 +200,102 @@ async def delete_user(user_id: str):
     return {"message": "User Deleted"}
 
 
+# Bulk User APIs
+@router.post("/bulk/users", status_code=status.HTTP_200_OK)
+async def bulk_create_users(users: List[UserCreate]):
+    check_bulk_size(users)
+    results = await bulk_insert(users_collection, [user.model_dump() for user in users])
+    return {"message": "Bulk Create Finished", "results": results}
+
+
+@router.patch("/bulk/users", status_code=status.HTTP_200_OK)
+async def bulk_update_users(users: List[UserBulkUpdate]):
+    check_bulk_size(users)
+    results = await bulk_update(users_collection, [user.model_dump(exclude_unset=True) for user in users])
+    return {"message": "Bulk Update Finished", "results": results}
+
+
+@router.delete("/bulk/users", status_code=status.HTTP_200_OK)
+async def bulk_delete_users(payload: BulkDelete):
+    check_bulk_size(payload.ids)
+    results = await bulk_delete(users_collection, payload.ids)
+    return {"message": "Bulk Delete Finished", "results": results}
+
+
 # Example Note REST APIs
-@router.get("/get-notes", status_code=status.HTTP_200_OK)
-async def get_notes():
-    notes = []
-    async for note in notes_collection.find():
-        notes.append(serialize_doc(note))
-    return {"notes": notes}
+@router.get("/get-notes", response_model=NotePage, status_code=status.HTTP_200_OK)
+async def get_notes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None
+):
+    query = {}
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+    projection = select_projection(NoteResponse, fields)
+    docs = await notes_read_collection.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    docs, next_cursor = paginate(docs, limit, lambda doc: doc["_id"])
+    return json_response(NotePage, {"notes": docs, "next_cursor": next_cursor})
+
+
+@router.get("/export-notes", status_code=status.HTTP_200_OK)
+async def export_notes(fields: str | None = None):
+    projection = select_projection(NoteResponse, fields)
+    return StreamingResponse(export_ndjson(notes_read_collection, projection), media_type="application/x-ndjson")
+
+
+@router.get("/search-notes", status_code=status.HTTP_200_OK)
+async def search_notes(
+    q: str = Query(min_length=1, max_length=MAX_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None
+):
+    # Ranked full-text search over title and content (see search.py)
+    offset = decode_offset(cursor)
+    docs = await search_cursor(notes_read_collection, q, limit, offset).to_list(length=limit + 1)
+    notes, next_cursor = search_page(docs, q, limit, offset)
+    return {"notes": notes, "next_cursor": next_cursor}
+
+
+@router.get("/notes/{note_id}", response_model=NoteResponse, status_code=status.HTTP_200_OK)
+async def get_note(note_id: str):
+    if not ObjectId.is_valid(note_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid note ID"
+        )
+    # find_one on _id is a point lookup on the default _id index
+    doc = await notes_collection.find_one({"_id": ObjectId(note_id)})
+    if doc is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    return json_response(NoteResponse, doc)
+
+
+@router.get("/notes", response_model=NoteBatch, status_code=status.HTTP_200_OK)
+async def get_notes_by_ids(ids: str, fields: str | None = None):
+    # One {"_id": {"$in": [...]}} query for the whole batch; items come back in the order of ?ids=
+    note_ids = decode_ids(ids)
+    projection = select_projection(NoteResponse, fields)
+    docs = await notes_collection.find({"_id": {"$in": note_ids}}, projection).to_list(length=len(note_ids))
+    docs, missing = order_by_ids(note_ids, docs, lambda doc: doc["_id"])
+    return json_response(NoteBatch, {"notes": docs, "missing": missing})
 
 
 @router.post("/create-note", status_code=status.HTTP_201_CREATED)
 async def create_note(note: NoteCreate):
-    existing = await notes_collection.find_one({"title": note.title})
-    
-    if existing:
+    note_dict = note.model_dump()
+    try:
+        result = await notes_collection.insert_one(note_dict)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Note with this title already exists"
         )
     
-    note_dict = note.model_dump()
-    result = await notes_collection.insert_one(note_dict)
-    
     if result.inserted_id:
         return {"message": "New Note Created"}
     
@@ -156,10 +320,16 @@ async def update_note(note_id: str, note_data: NoteUpdate):
             detail="No data provided for updation"
         )
     
-    result = await notes_collection.update_one(
-        {"_id": ObjectId(note_id)},
-        {"$set": update_data}
-    )
+    try:
+        result = await notes_collection.update_one(
+            {"_id": ObjectId(note_id)},
+            {"$set": update_data}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Note with this title already exists"
+        )
     
     if result.matched_count == 0:
         raise HTTPException(
@@ -186,4 +356,26 @@ async def delete_note(note_id: str):
             detail="Note not found"
         )
     
-    return {"message": "Note Deleted"}
\ No newline at end of file
+    return {"message": "Note Deleted"}
+
+
+# Bulk Note APIs
+@router.post("/bulk/notes", status_code=status.HTTP_200_OK)
+async def bulk_create_notes(notes: List[NoteCreate]):
+    check_bulk_size(notes)
+    results = await bulk_insert(notes_collection, [note.model_dump() for note in notes])
+    return {"message": "Bulk Create Finished", "results": results}
+
+
+@router.patch("/bulk/notes", status_code=status.HTTP_200_OK)
+async def bulk_update_notes(notes: List[NoteBulkUpdate]):
+    check_bulk_size(notes)
+    results = await bulk_update(notes_collection, [note.model_dump(exclude_unset=True) for note in notes])
+    return {"message": "Bulk Update Finished", "results": results}
+
+
+@router.delete("/bulk/notes", status_code=status.HTTP_200_OK)
+async def bulk_delete_notes(payload: BulkDelete):
+    check_bulk_size(payload.ids)
+    results = await bulk_delete(notes_collection, payload.ids)
+    return {"message": "Bulk Delete Finished", "results": results}
\ No newline at end of file
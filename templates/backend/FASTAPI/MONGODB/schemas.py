@@ -1,5 +1,8 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, BeforeValidator, EmailStr, Field
+from typing import Annotated, Optional
+
+# An ObjectId (or anything else) rendered as its string form
+ObjectIdStr = Annotated[str, BeforeValidator(str)]
 
 # User Schemas 
 class UserCreate(BaseModel):
@@ -10,10 +13,23 @@ class UserUpdate(BaseModel):
     username: Optional[str] = None
     email: Optional[EmailStr] = None
 
-class UserResponse(BaseModel):
+class UserBulkUpdate(UserUpdate):
     id: str
-    username: str
-    email: str
+
+# Response models for the read routes (see responses.py). They validate documents as PyMongo returns
+# them: id is read from _id. Fields left out by ?fields= are absent from the JSON, not null.
+class UserResponse(BaseModel):
+    id: ObjectIdStr = Field(validation_alias="_id")
+    username: Optional[str] = None
+    email: Optional[str] = None
+
+class UserPage(BaseModel):
+    users: list[UserResponse]
+    next_cursor: Optional[str]
+
+class UserBatch(BaseModel):
+    users: list[UserResponse]
+    missing: list[ObjectIdStr]
 
 
 # Note Schemas 
@@ -25,7 +41,23 @@ class NoteUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
 
-class NoteResponse(BaseModel):
+class NoteBulkUpdate(NoteUpdate):
     id: str
-    title: str
-    content: str
\ No newline at end of file
+
+class NoteResponse(BaseModel):
+    id: ObjectIdStr = Field(validation_alias="_id")
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+class NotePage(BaseModel):
+    notes: list[NoteResponse]
+    next_cursor: Optional[str]
+
+class NoteBatch(BaseModel):
+    notes: list[NoteResponse]
+    missing: list[ObjectIdStr]
+
+
+# Bulk Schemas
+class BulkDelete(BaseModel):
+    ids: list[str]
\ No newline at end of file
@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# APP_ENV=development (default) runs uvicorn with hot reload, exactly like `python main.py`.
+# APP_ENV=production runs gunicorn with the settings in gunicorn.conf.py and N uvicorn workers.
+APP_ENV = os.getenv("APP_ENV", "development")
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "5000"))
+
+def run_development():
+    import uvicorn
+    uvicorn.run("main:app", host=HOST, port=PORT, reload=True)
+
+
+def run_production():
+    if sys.platform == "win32":
+        # gunicorn is POSIX only; fall back to uvicorn's own multi-process supervisor.
+        # Workers share metrics through files, as under gunicorn (see gunicorn.conf.py).
+        metrics_dir = os.environ.setdefault(
+            "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "autostack-metrics")
+        )
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+        import uvicorn
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            workers=int(os.getenv("WEB_CONCURRENCY") or 0) or multiprocessing.cpu_count(),
+            backlog=int(os.getenv("GUNICORN_BACKLOG", "2048")),
+            timeout_keep_alive=int(os.getenv("GUNICORN_KEEPALIVE", "5")),
+        )
+        return
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"])
+
+
+if __name__ == "__main__":
+    if APP_ENV == "production":
+        run_production()
+    else:
+        run_development()
@@ -0,0 +1,6 @@
+from uvicorn.workers import UvicornWorker
+
+# gunicorn worker class for production (see gunicorn.conf.py). Pins the fast event loop
+# and HTTP parser, both of which ship with uvicorn[standard].
+class ProductionUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
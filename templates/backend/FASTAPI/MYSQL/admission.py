@@ -0,0 +1,237 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from metrics import REJECTED
+
+load_dotenv()
+
+# Admission control: every request joins a pool chosen by its route (route_pool below). A pool runs
+# at most `limit` requests at once and lets up to `queue` more wait ADMISSION_QUEUE_TIMEOUT_MS for a
+# slot; the rest get 503 with Retry-After right away, before they touch the database. When the
+# database slows down, the excess fails fast instead of piling up in the threadpool and the
+# connection pool queue and making every request slow. Separate pools keep writes, bulk requests and
+# exports from taking the slots cheap reads need. Limits are per worker process: with the sync
+# engine keep their sum within the threadpool (40 threads), and for SQL near DB_POOL_SIZE +
+# DB_MAX_OVERFLOW, since requests beyond that only wait for a connection.
+#
+# RATE_LIMITS adds a token bucket per client and pool: `rate` requests per second on average, bursts
+# of up to `burst`. A client over it gets 429 with Retry-After. RATE_LIMIT_BACKEND=memory keeps the
+# buckets in each worker, so a client's budget is per worker; redis shares them between workers.
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "false").lower() == "true"
+# pool=limit/queue, for every pool route_pool can return; a pool left out is not limited
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS") or "read=32/64,search=4/16,write=8/32,bulk=2/8,export=2/8"
+ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000"))
+ADMISSION_RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")
+# pool=rate/burst; empty turns rate limiting off
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+# Header that identifies the client (X-API-Key, or X-Forwarded-For behind a proxy that sets it);
+# empty uses the client address
+RATE_LIMIT_KEY_HEADER = os.getenv("RATE_LIMIT_KEY_HEADER", "").lower().encode()
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+KEY_PREFIX = "autostack"
+
+# Routes with a pool of their own, by path prefix; other reads are "read" and other writes "write"
+ROUTE_POOLS = (
+    ("/bulk/", "bulk"),
+    ("/export-", "export"),
+    ("/search-notes", "search"),
+)
+# Always admitted, so monitoring keeps working under overload
+EXEMPT_PATHS = {"/", "/metrics", "/cache-stats"}
+
+
+def route_pool(method, path):
+    if path in EXEMPT_PATHS:
+        return None
+    for prefix, pool in ROUTE_POOLS:
+        if path.startswith(prefix):
+            return pool
+    return "read" if method in ("GET", "HEAD") else "write"
+
+
+def parse_limits(setting, spec, number, valid, requirement):
+    # "read=32/64,write=8/32" -> {"read": (32, 64), "write": (8, 32)}. A pair that is not a number or
+    # fails valid() stops the worker at import, instead of failing every request of its pool later.
+    limits = {}
+    for item in spec.split(","):
+        if item.strip():
+            name, _, values = item.partition("=")
+            first, _, second = values.partition("/")
+            try:
+                pair = (number(first), number(second or first))
+            except ValueError:
+                pair = None
+            if pair is None or not valid(*pair):
+                raise ValueError(f"{setting}: {item.strip()!r} needs {requirement}; leave a pool out to not limit it")
+            limits[name.strip()] = pair
+    return limits
+
+
+class Pool:
+    # Running requests hold a semaphore slot; waiting ones are counted so the queue stays bounded
+    def __init__(self, limit, queue):
+        self.slots = asyncio.Semaphore(limit)
+        self.queue = queue
+        self.waiting = 0
+
+    async def acquire(self):
+        # None once admitted, otherwise why the request was turned away
+        if not self.slots.locked():
+            await self.slots.acquire()
+            return None
+        if self.waiting >= self.queue:
+            return "queue_full"
+        self.waiting += 1
+        # asyncio.wait rather than wait_for: before Python 3.12, wait_for can take the slot and still
+        # raise TimeoutError, and that slot is never released
+        acquire = asyncio.ensure_future(self.slots.acquire())
+        try:
+            await asyncio.wait({acquire}, timeout=ADMISSION_QUEUE_TIMEOUT_MS / 1000)
+        except BaseException:
+            # The request was cancelled while queued
+            if acquire.done():
+                self.slots.release()
+            else:
+                acquire.cancel()
+            raise
+        finally:
+            self.waiting -= 1
+        if not acquire.done():
+            acquire.cancel()  # a cancelled Semaphore.acquire hands back a slot it was just given
+            return "queue_timeout"
+        return None
+
+    def release(self):
+        self.slots.release()
+
+
+class MemoryBuckets:
+    # Per-process token buckets: (tokens, updated_at) per key, the least recently seen client evicted first
+    def __init__(self, max_clients):
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+
+    async def take(self, key, rate, burst):
+        # 0 when a token was taken, otherwise the seconds until the next one
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+# The same bucket in Redis, updated atomically in one round trip. A bucket refills completely in
+# burst / rate seconds, so the key expires after that.
+TAKE_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    def __init__(self, url):
+        from redis import asyncio as aioredis
+        self.script = aioredis.from_url(url).register_script(TAKE_SCRIPT)
+
+    async def take(self, key, rate, burst):
+        return float(await self.script(keys=[key], args=[rate, burst, time.time()]))
+
+
+POOLS = {
+    name: Pool(limit, queue)
+    for name, (limit, queue) in parse_limits(
+        "ADMISSION_LIMITS", ADMISSION_LIMITS, int,
+        lambda limit, queue: limit >= 1 and queue >= 0, "limit/queue with a limit of at least 1",
+    ).items()
+} if ADMISSION_CONTROL else {}
+RATES = parse_limits(
+    "RATE_LIMITS", RATE_LIMITS, float,
+    lambda rate, burst: rate > 0 and burst >= 1, "rate/burst with a rate above 0 and a burst of at least 1",
+)
+
+
+def create_buckets():
+    if not RATES:
+        return None
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBuckets(REDIS_URL)
+    return MemoryBuckets(RATE_LIMIT_MAX_CLIENTS)
+
+
+buckets = create_buckets()
+
+
+def client_key(scope):
+    if RATE_LIMIT_KEY_HEADER:
+        value = dict(scope["headers"]).get(RATE_LIMIT_KEY_HEADER)
+        if value:
+            return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def reject(send, status, retry_after, detail):
+    body = json.dumps({"detail": detail}).encode()
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(retry_after).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    # Pure ASGI middleware: rate limit first (cheap, per client), then a slot in the route's pool,
+    # held until the response is sent, the whole body of a streamed export included
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        pool_name = route_pool(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if pool_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        rate = RATES.get(pool_name)
+        if rate is not None:
+            wait = await buckets.take(f"{KEY_PREFIX}:rate:{pool_name}:{client_key(scope)}", *rate)
+            if wait:
+                REJECTED.labels(pool_name, "rate_limited").inc()
+                await reject(send, 429, math.ceil(wait), "Too many requests")
+                return
+
+        pool = POOLS.get(pool_name)
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+        reason = await pool.acquire()
+        if reason is not None:
+            REJECTED.labels(pool_name, reason).inc()
+            await reject(send, 503, ADMISSION_RETRY_AFTER, "Server is busy, try again later")
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release()
@@ -1,11 +1,17 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
+from metrics import TimedQueuePool, instrument_sqlalchemy
+from profiler import QUERY_PROFILER, profile_sqlalchemy
 import os
 
 load_dotenv()
 
+# Opt-in fast JSON: FAST_JSON=true makes orjson the default response encoder
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
 # MySQL connection via environment variables
 DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
@@ -13,9 +19,38 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "example_db")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# DATABASE_URL, if set, replaces the DB_* settings (the bench/ stand-in points it at SQLite)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Connection pool tuning (see .env). pool_pre_ping costs a round trip on every checkout;
+# with DB_POOL_PRE_PING=false, pool_recycle alone guards against stale connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Set DB_EXTERNAL_POOL=true when an external pooler (e.g. ProxySQL) sits in front of the database.
+# SQLAlchemy then opens a connection per checkout (NullPool) and leaves pooling to it.
+DB_EXTERNAL_POOL = os.getenv("DB_EXTERNAL_POOL", "false").lower() == "true"
+
+if DB_EXTERNAL_POOL:
+    engine_options = {"poolclass": NullPool}
+else:
+    engine_options = {
+        "poolclass": TimedQueuePool,  # times pool checkouts for /metrics
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Statement count and latency for /metrics
+instrument_sqlalchemy()
+# Per-request statement counts and N+1 / slow query warnings in development (see profiler.py)
+if QUERY_PROFILER:
+    profile_sqlalchemy()
+engine = create_engine(DATABASE_URL, **engine_options)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
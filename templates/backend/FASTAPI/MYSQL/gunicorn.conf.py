@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Production process model: one gunicorn master supervising uvicorn workers (see serve.py).
+# Send SIGHUP to the master for a graceful reload: new workers start before old ones drain.
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+# Async workers each multiplex many requests, so one per core is the usual starting point
+workers = int(os.getenv("WEB_CONCURRENCY") or 0) or multiprocessing.cpu_count()
+worker_class = "workers.ProductionUvicornWorker"
+
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers periodically to cap slow memory growth; jitter avoids restarting all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+accesslog = "-"
+errorlog = "-"
+
+# /metrics merges every worker's samples through per-process files in this directory (see metrics.py).
+# It must be set before the app imports prometheus_client, so it is done here in the master.
+METRICS_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "autostack-metrics")
+)
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to this one
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
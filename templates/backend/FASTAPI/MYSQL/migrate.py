@@ -0,0 +1,47 @@
+import os
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from config import engine
+
+# Schema migrations run once per deploy, before any worker starts: `python migrate.py` (the same as
+# `alembic upgrade head`; serve.py runs it unless MIGRATE_ON_START=false). Workers never change the
+# schema: on startup they only check that the database is at SCHEMA_REVISION, with one SELECT and
+# without importing Alembic, which would add to every worker's cold start.
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+# The newest revision in migrations/versions. Bump it with every new migration; upgrade()
+# refuses to run while the two disagree.
+SCHEMA_REVISION = "0003"
+
+
+def upgrade():
+    from alembic import command
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(ALEMBIC_INI)
+    head = ScriptDirectory.from_config(config).get_current_head()
+    if head != SCHEMA_REVISION:
+        raise SystemExit(f"migrations/ ends at revision {head} but migrate.SCHEMA_REVISION is {SCHEMA_REVISION}; update it.")
+    command.upgrade(config, "head")
+
+
+def schema_error(current):
+    if current == SCHEMA_REVISION:
+        return None
+    return f"Database schema is at revision {current or 'none'}, this code needs {SCHEMA_REVISION}. Run `python migrate.py` first."
+
+
+def check_schema():
+    with engine.connect() as connection:
+        try:
+            current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except DBAPIError:
+            current = None  # no alembic_version table: never migrated
+    error = schema_error(current)
+    if error:
+        raise RuntimeError(error)
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,53 @@
+"""initial schema
+
+The tables as Base.metadata.create_all built them before migrations. A database created
+that way already has them: mark it with `alembic stamp 0001`, then `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(80), nullable=False),
+        sa.Column("email", sa.String(120), nullable=False),
+        sa.UniqueConstraint("email", name="email"),
+    )
+    op.create_index("ix_user_id", "user", ["id"])
+    op.create_index("ix_user_username", "user", ["username"], unique=True)
+
+    op.create_table(
+        "note",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(80), nullable=False),
+        sa.Column("content", sa.String(120), nullable=False),
+        sa.UniqueConstraint("content", name="content"),
+    )
+    op.create_index("ix_note_id", "note", ["id"])
+    op.create_index("ix_note_title", "note", ["title"], unique=True)
+
+    op.create_table(
+        "table_version",
+        sa.Column("name", sa.String(40), primary_key=True),
+        sa.Column("etag", sa.String(64), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("table_version")
+    op.drop_table("note")
+    op.drop_table("user")
@@ -0,0 +1,41 @@
+"""tune indexes and note content type
+
+- note.content: TEXT, without the unique index (a B-tree over free text slowed every insert)
+- drop ix_user_id and ix_note_id, which duplicated the primary key indexes
+
+Keyset pages need no new index: InnoDB already stores rows in primary key order.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Batch mode emits plain ALTERs here and rebuilds the table on SQLite (bench --stand-in)
+    with op.batch_alter_table("note") as batch:
+        batch.drop_constraint("content", type_="unique")
+        batch.alter_column("content", type_=sa.Text(), existing_type=sa.String(120), existing_nullable=False)
+        batch.drop_index("ix_note_id")
+    with op.batch_alter_table("user") as batch:
+        batch.drop_index("ix_user_id")
+
+
+def downgrade():
+    # Fails if a note's content is longer than 120 characters or duplicates another
+    with op.batch_alter_table("user") as batch:
+        batch.create_index("ix_user_id", ["id"])
+    with op.batch_alter_table("note") as batch:
+        batch.create_index("ix_note_id", ["id"])
+        batch.alter_column("content", type_=sa.String(120), existing_type=sa.Text(), existing_nullable=False)
+        batch.create_unique_constraint("content", ["content"])
@@ -0,0 +1,33 @@
+"""full-text search over notes
+
+- ix_note_fulltext: InnoDB FULLTEXT index over note.title and note.content, used by /search-notes
+
+The first FULLTEXT index on a table adds InnoDB's hidden FTS_DOC_ID column, which rebuilds the
+note table once; on a large table run this in a quiet window.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite (bench --stand-in) has no FULLTEXT indexes; /search-notes needs MySQL
+    if op.get_context().dialect.name != "mysql":
+        return
+    op.create_index("ix_note_fulltext", "note", ["title", "content"], mysql_prefix="FULLTEXT")
+
+
+def downgrade():
+    if op.get_context().dialect.name != "mysql":
+        return
+    op.drop_index("ix_note_fulltext", table_name="note")
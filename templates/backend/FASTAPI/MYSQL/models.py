@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, Text
 from config import Base
 
 class User(Base):
     __tablename__ = "user"
-    
-    id = Column(Integer, primary_key=True, index=True)
+    # InnoDB stores rows in primary key order, so a keyset page (WHERE id > :cursor ORDER BY id)
+    # is already a range read of the clustered index; no extra index is needed for it.
+    # email's unique constraint is also the index lookups by email use.
+    id = Column(Integer, primary_key=True)
     username = Column(String(80), unique=True, nullable=False, index=True)
     email = Column(String(120), unique=True, nullable=False)
 
@@ -18,14 +20,25 @@ class User(Base):
 
 class Note(Base):
     __tablename__ = "note"
-    
-    id = Column(Integer, primary_key=True, index=True)
+    # /search-notes runs MATCH (title, content) AGAINST (...) on the InnoDB FULLTEXT index ix_note_fulltext
+    __table_args__ = (Index("ix_note_fulltext", "title", "content", mysql_prefix="FULLTEXT"),)
+
+    id = Column(Integer, primary_key=True)
     title = Column(String(80), unique=True, nullable=False, index=True)
-    content = Column(String(120), unique=True, nullable=False)
+    # Free text: not unique and not B-tree indexed, a B-tree over it would only slow down every write
+    content = Column(Text, nullable=False)
 
     def to_json(self):
         return {
             "id": self.id,
             "title": self.title,
             "content": self.content
-        }
\ No newline at end of file
+        }
+
+
+# One row per table; etag is replaced after every successful write (conditional GET, see main.py)
+class TableVersion(Base):
+    __tablename__ = "table_version"
+
+    name = Column(String(40), primary_key=True)
+    etag = Column(String(64), nullable=False)
\ No newline at end of file
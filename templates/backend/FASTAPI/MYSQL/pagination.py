@@ -0,0 +1,68 @@
+import base64
+import binascii
+from fastapi import HTTPException, status
+
+# Keyset pagination: clients pass back the opaque cursor from the previous page
+# and we resume with "WHERE id > last_id ORDER BY id", so every page is an index range scan.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# id columns are INTEGER (32-bit signed in PostgreSQL and MySQL). A larger number can match no row,
+# and the driver would fail on it instead of answering, so the routes check ids against this first.
+MAX_ID = 2**31 - 1
+
+def valid_id(value):
+    return 0 < value <= MAX_ID
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        last_id = int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if not valid_id(last_id):
+            raise ValueError
+        return last_id
+    except (ValueError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+# Batch reads: ?ids=3,1,2 with at most MAX_PAGE_SIZE ids. Repeats are dropped and the response
+# keeps the order the ids were asked for in.
+def decode_ids(ids):
+    try:
+        values = [int(value) for value in ids.split(",")]
+        if not all(valid_id(value) for value in values):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid id"
+        )
+    if len(values) > MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_PAGE_SIZE} ids per request"
+        )
+    return list(dict.fromkeys(values))
+
+
+# Rows are fetched with limit + 1 so we know whether another page exists without a COUNT query
+def paginate(rows, limit, key):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(key(rows[-1]))
+    return rows, None
+
+
+# Lines the rows of WHERE id IN (...) up with the requested ids: (rows, missing ids)
+def order_by_ids(ids, items, key):
+    by_id = {key(item): item for item in items}
+    return [by_id[id_] for id_ in ids if id_ in by_id], [id_ for id_ in ids if id_ not in by_id]
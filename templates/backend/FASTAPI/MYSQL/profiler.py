@@ -0,0 +1,112 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+# Development query profiler: counts the statements each request runs, flags statements repeated
+# N_PLUS_ONE_THRESHOLD or more times (typically a lazy load inside a to_json() loop) and statements
+# slower than SLOW_QUERY_MS, adds a Server-Timing header and logs a warning for flagged requests.
+# On by default with APP_ENV=development; QUERY_PROFILER overrides it either way.
+APP_ENV = os.getenv("APP_ENV", "development")
+QUERY_PROFILER = (os.getenv("QUERY_PROFILER") or str(APP_ENV == "development")).lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+logger = logging.getLogger("autostack.profiler")
+
+# The profile of the request being served. Sync routes and the DB events run on threadpool
+# threads, which get a copy of the context: they mutate this object, they never rebind it.
+current_profile = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.statements = Counter()
+        self.slow = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            self.slow.append((statement, seconds))
+
+    def repeated(self):
+        return [(statement, n) for statement, n in self.statements.items() if n >= N_PLUS_ONE_THRESHOLD]
+
+    def server_timing(self):
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+    def report(self, method, path):
+        repeated = self.repeated()
+        if not repeated and not self.slow:
+            logger.debug("%s %s: %d queries in %.2f ms", method, path, self.count, self.seconds * 1000)
+            return
+        lines = [f"{method} {path}: {self.count} queries in {self.seconds * 1000:.2f} ms"]
+        for statement, n in repeated:
+            lines.append(f"  possible N+1, ran {n}x: {statement}")
+        for statement, seconds in self.slow:
+            lines.append(f"  slow ({seconds * 1000:.2f} ms): {statement}")
+        logger.warning("\n".join(lines))
+
+
+# SQLAlchemy: the statement text has placeholders for parameters, so a lazy load issued once
+# per row shows up as the same statement repeated.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None and conn.info.get("profile_start"):
+        profile.record(" ".join(statement.split()), time.perf_counter() - conn.info["profile_start"].pop())
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.execution_context is not None and context.connection is not None:
+        starts = context.connection.info.get("profile_start")
+        if starts:
+            starts.pop()
+
+
+def profile_sqlalchemy():
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+class QueryProfilerMiddleware:
+    # Pure ASGI middleware: one RequestProfile per HTTP request
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_PROFILER:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            profile.report(scope["method"], scope["path"])
@@ -0,0 +1,70 @@
+import os
+from functools import lru_cache
+from typing import Union, get_args, get_origin
+from dotenv import load_dotenv
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+load_dotenv()
+
+# JSON for the list, batch and single-item read routes. A route declares its response model
+# (schemas.py) for the OpenAPI docs and returns json_response(Model, content), where content holds
+# result rows or ORM objects as the session returned them. That skips FastAPI's own handling of a
+# returned value (a validate / serialize round trip, then json.dumps), which is slow on row dicts:
+# Row._asdict() keys are SQLAlchemy str subclasses, and pydantic-core inspects each one.
+#
+# RESPONSE_SERIALIZER picks the serializer:
+#   pydantic (default): the response model validates the content and model_dump_json writes the
+#     JSON, both in pydantic-core. ORM objects are read through from_attributes; result rows are
+#     turned into plain dicts first, which pydantic validates faster than it reads a Row's attributes.
+#   msgspec: Structs generated from the same models, filled straight from the rows' attributes by
+#     msgspec.convert and written by msgspec's encoder; several times faster again on large pages
+#     (python -m bench.serialize)
+RESPONSE_SERIALIZER = os.getenv("RESPONSE_SERIALIZER", "pydantic").lower()
+
+
+def row_dicts(value):
+    if isinstance(value, list) and value and isinstance(value[0], Row):
+        keys = [str(key) for key in value[0]._fields]
+        return [dict(zip(keys, row)) for row in value]
+    return value
+
+
+def pydantic_json(model, content):
+    if isinstance(content, dict):
+        content = {key: row_dicts(value) for key, value in content.items()}
+    # exclude_unset leaves out the columns ?fields= did not select
+    return model.model_validate(content).model_dump_json(exclude_unset=True)
+
+
+@lru_cache(maxsize=None)
+def struct_type(annotation):
+    # The msgspec type for a pydantic annotation: models become Structs with the same fields, and a
+    # field with a default is omitted from the JSON while unset, like exclude_unset above
+    import msgspec
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        fields = [
+            (name, struct_type(field.annotation)) if field.is_required()
+            else (name, Union[struct_type(field.annotation), msgspec.UnsetType], msgspec.UNSET)
+            for name, field in annotation.model_fields.items()
+        ]
+        return msgspec.defstruct(annotation.__name__, fields, omit_defaults=True)
+    args = get_args(annotation)
+    if not args:
+        return annotation
+    args = tuple(struct_type(arg) for arg in args)
+    return Union[args] if get_origin(annotation) is not list else list[args[0]]
+
+
+def msgspec_json(model, content):
+    import msgspec
+    return msgspec.json.encode(msgspec.convert(content, struct_type(model), from_attributes=True))
+
+
+SERIALIZERS = {"pydantic": pydantic_json, "msgspec": msgspec_json}
+serialize = SERIALIZERS.get(RESPONSE_SERIALIZER, pydantic_json)
+
+
+def json_response(model, content):
+    return Response(serialize(model, content), media_type="application/json")
@@ -1,15 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select, insert, update, delete
 from sqlalchemy.orm import Session
 from typing import List
-from config import get_db
+import json
+from config import get_db, SessionLocal
 from models import User, Note
+from bulk import MAX_BULK_ITEMS, bulk_insert, bulk_update, bulk_delete
+from cache import response_cache
+from metrics import CONTENT_TYPE_LATEST, render_metrics
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, decode_ids, order_by_ids, paginate, valid_id
+from projection import select_columns
+from responses import json_response
+from search import MAX_QUERY_LENGTH, decode_offset, search_page, search_statement
 from schemas import (
-    UserCreate, UserUpdate, UserResponse,
-    NoteCreate, NoteUpdate, NoteResponse
+    UserCreate, UserUpdate, UserBulkUpdate, UserResponse, UserPage, UserBatch,
+    NoteCreate, NoteUpdate, NoteBulkUpdate, NoteResponse, NotePage, NoteBatch,
+    BulkDelete
 )
 
 router = APIRouter()
 
+EXPORT_BATCH_SIZE = 1000
+
+# Streams the selected columns of a table as NDJSON over a server-side cursor, one chunk per yield_per
+# batch. It opens its own session because the get_db session is closed before a streamed body is sent.
+def export_ndjson(model, columns):
+    with SessionLocal() as db:
+        rows = db.execute(select(*columns).order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for batch in rows.partitions():
+            yield "".join(json.dumps(row._asdict()) + "\n" for row in batch)
+
+def check_bulk_size(items):
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No data provided"
+        )
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_ITEMS} items per bulk request"
+        )
+
 @router.get("/", status_code=status.HTTP_200_OK)
 def autostack():
     message = """ 
@@ -20,40 +53,84 @@ def autostack():
     return {"message": message, "backend": "FastAPI", "database": "PostgreSQL", "filepath": 'backend/main.py'}
 
 
+@router.get("/cache-stats", status_code=status.HTTP_200_OK)
+def cache_stats():
+    # Hit/miss counters of this worker process
+    return response_cache.stats()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus text format; merges all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Example User REST APIs
-@router.get("/get-users", response_model=dict, status_code=status.HTTP_200_OK)
-def get_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    json_users = [user.to_json() for user in users]
-    return {"users": json_users}
+@router.get("/get-users", response_model=UserPage, status_code=status.HTTP_200_OK)
+def get_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db)
+):
+    query = select(*select_columns(User, fields)).order_by(User.id)
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        query = query.where(User.id > last_id)
+    rows, next_cursor = paginate(db.execute(query.limit(limit + 1)).all(), limit, lambda row: row.id)
+    return json_response(UserPage, {"users": rows, "next_cursor": next_cursor})
+
+
+@router.get("/export-users", status_code=status.HTTP_200_OK)
+def export_users(fields: str | None = None):
+    return StreamingResponse(export_ndjson(User, select_columns(User, fields)), media_type="application/x-ndjson")
+
+
+@router.get("/users/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
+def get_user(user_id: int, db: Session = Depends(get_db)):
+    # Primary key lookup: Session.get checks the identity map, then runs SELECT ... WHERE id = :id
+    user = db.get(User, user_id) if valid_id(user_id) else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return json_response(UserResponse, user)
+
+
+@router.get("/users", response_model=UserBatch, status_code=status.HTTP_200_OK)
+def get_users_by_ids(ids: str, fields: str | None = None, db: Session = Depends(get_db)):
+    # One WHERE id IN (...) for the whole batch; items come back in the order of ?ids=
+    user_ids = decode_ids(ids)
+    rows = db.execute(select(*select_columns(User, fields)).where(User.id.in_(user_ids))).all()
+    rows, missing = order_by_ids(user_ids, rows, lambda row: row.id)
+    return json_response(UserBatch, {"users": rows, "missing": missing})
 
 
 @router.post("/create-user", status_code=status.HTTP_201_CREATED)
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    new_user = User(username=user.username, email=user.email)
+    # MySQL has no RETURNING; the driver reports the new key from the INSERT itself
     try:
-        db.add(new_user)
+        result = db.execute(insert(User).values(username=user.username, email=user.email))
         db.commit()
-        db.refresh(new_user)
+        new_id = result.inserted_primary_key[0]  # cursor.lastrowid, no extra query
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    return {"message": "New User Created"}
+    return {"message": "New User Created", "id": new_id}
 
 
 @router.patch("/update-users/{user_id}", status_code=status.HTTP_200_OK)
 def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
+    if not valid_id(user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
+
     update_data = user_data.model_dump(exclude_unset=True)
     if not update_data:
         raise HTTPException(
@@ -61,12 +138,10 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
             detail="No data provided"
         )
     
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
+    # Single UPDATE ... WHERE id = :id; rowcount tells us whether the row existed
     try:
+        result = db.execute(update(User).where(User.id == user_id).values(**update_data))
         db.commit()
-        db.refresh(user)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -74,21 +149,25 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
             detail=str(e)
         )
     
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
     return {"message": "User Updated"}
 
 
 @router.delete("/delete-user/{user_id}", status_code=status.HTTP_200_OK)
 def delete_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
+    if not valid_id(user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
+
     try:
-        db.delete(user)
+        result = db.execute(delete(User).where(User.id == user_id))
         db.commit()
     except Exception as e:
         db.rollback()
@@ -97,43 +176,117 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
             detail=str(e)
         )
     
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
     return {"message": "User Deleted"}
 
 
+# Bulk User APIs
+@router.post("/bulk/users", status_code=status.HTTP_200_OK)
+def bulk_create_users(users: List[UserCreate], db: Session = Depends(get_db)):
+    check_bulk_size(users)
+    results = bulk_insert(db, User, [user.model_dump() for user in users])
+    return {"message": "Bulk Create Finished", "results": results}
+
+
+@router.patch("/bulk/users", status_code=status.HTTP_200_OK)
+def bulk_update_users(users: List[UserBulkUpdate], db: Session = Depends(get_db)):
+    check_bulk_size(users)
+    results = bulk_update(db, User, [user.model_dump(exclude_unset=True) for user in users])
+    return {"message": "Bulk Update Finished", "results": results}
+
+
+@router.delete("/bulk/users", status_code=status.HTTP_200_OK)
+def bulk_delete_users(payload: BulkDelete, db: Session = Depends(get_db)):
+    check_bulk_size(payload.ids)
+    results = bulk_delete(db, User, payload.ids)
+    return {"message": "Bulk Delete Finished", "results": results}
+
+
 # Example Note REST APIs
-@router.get("/get-notes", response_model=dict, status_code=status.HTTP_200_OK)
-def get_notes(db: Session = Depends(get_db)):
-    notes = db.query(Note).all()
-    json_notes = [note.to_json() for note in notes]
-    return {"notes": json_notes}
+@router.get("/get-notes", response_model=NotePage, status_code=status.HTTP_200_OK)
+def get_notes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db)
+):
+    query = select(*select_columns(Note, fields)).order_by(Note.id)
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        query = query.where(Note.id > last_id)
+    rows, next_cursor = paginate(db.execute(query.limit(limit + 1)).all(), limit, lambda row: row.id)
+    return json_response(NotePage, {"notes": rows, "next_cursor": next_cursor})
+
+
+@router.get("/export-notes", status_code=status.HTTP_200_OK)
+def export_notes(fields: str | None = None):
+    return StreamingResponse(export_ndjson(Note, select_columns(Note, fields)), media_type="application/x-ndjson")
+
+
+@router.get("/search-notes", status_code=status.HTTP_200_OK)
+def search_notes(
+    q: str = Query(min_length=1, max_length=MAX_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_db)
+):
+    # Ranked full-text search over title and content (see search.py)
+    offset = decode_offset(cursor)
+    rows = db.execute(search_statement(q, limit, offset)).all()
+    notes, next_cursor = search_page(rows, q, limit, offset)
+    return {"notes": notes, "next_cursor": next_cursor}
+
+
+@router.get("/notes/{note_id}", response_model=NoteResponse, status_code=status.HTTP_200_OK)
+def get_note(note_id: int, db: Session = Depends(get_db)):
+    # Primary key lookup: Session.get checks the identity map, then runs SELECT ... WHERE id = :id
+    note = db.get(Note, note_id) if valid_id(note_id) else None
+    if note is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    return json_response(NoteResponse, note)
+
+
+@router.get("/notes", response_model=NoteBatch, status_code=status.HTTP_200_OK)
+def get_notes_by_ids(ids: str, fields: str | None = None, db: Session = Depends(get_db)):
+    # One WHERE id IN (...) for the whole batch; items come back in the order of ?ids=
+    note_ids = decode_ids(ids)
+    rows = db.execute(select(*select_columns(Note, fields)).where(Note.id.in_(note_ids))).all()
+    rows, missing = order_by_ids(note_ids, rows, lambda row: row.id)
+    return json_response(NoteBatch, {"notes": rows, "missing": missing})
 
 
 @router.post("/create-note", status_code=status.HTTP_201_CREATED)
 def create_note(note: NoteCreate, db: Session = Depends(get_db)):
-    new_note = Note(title=note.title, content=note.content)
+    # MySQL has no RETURNING; the driver reports the new key from the INSERT itself
     try:
-        db.add(new_note)
+        result = db.execute(insert(Note).values(title=note.title, content=note.content))
         db.commit()
-        db.refresh(new_note)
+        new_id = result.inserted_primary_key[0]  # cursor.lastrowid, no extra query
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    return {"message": "New Note Created"}
+    return {"message": "New Note Created", "id": new_id}
 
 
 @router.patch("/update-notes/{note_id}", status_code=status.HTTP_200_OK)
 def update_note(note_id: int, note_data: NoteUpdate, db: Session = Depends(get_db)):
-    note = db.query(Note).filter(Note.id == note_id).first()
-    
-    if not note:
+    if not valid_id(note_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found"
         )
-    
+
     update_data = note_data.model_dump(exclude_unset=True)
     if not update_data:
         raise HTTPException(
@@ -141,12 +294,10 @@ def update_note(note_id: int, note_data: NoteUpdate, db: Session = Depends(get_d
             detail="No data provided for updation"
         )
     
-    for field, value in update_data.items():
-        setattr(note, field, value)
-    
+    # Single UPDATE ... WHERE id = :id; rowcount tells us whether the row existed
     try:
+        result = db.execute(update(Note).where(Note.id == note_id).values(**update_data))
         db.commit()
-        db.refresh(note)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -154,21 +305,25 @@ def update_note(note_id: int, note_data: NoteUpdate, db: Session = Depends(get_d
             detail=str(e)
         )
     
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    
     return {"message": "Note Updated"}
 
 
 @router.delete("/delete-note/{note_id}", status_code=status.HTTP_200_OK)
 def delete_note(note_id: int, db: Session = Depends(get_db)):
-    note = db.query(Note).filter(Note.id == note_id).first()
-    
-    if not note:
+    if not valid_id(note_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found"
         )
-    
+
     try:
-        db.delete(note)
+        result = db.execute(delete(Note).where(Note.id == note_id))
         db.commit()
     except Exception as e:
         db.rollback()
@@ -177,4 +332,32 @@ def delete_note(note_id: int, db: Session = Depends(get_db)):
             detail=str(e)
         )
     
-    return {"message": "Note Deleted"}
\ No newline at end of file
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    
+    return {"message": "Note Deleted"}
+
+
+# Bulk Note APIs
+@router.post("/bulk/notes", status_code=status.HTTP_200_OK)
+def bulk_create_notes(notes: List[NoteCreate], db: Session = Depends(get_db)):
+    check_bulk_size(notes)
+    results = bulk_insert(db, Note, [note.model_dump() for note in notes])
+    return {"message": "Bulk Create Finished", "results": results}
+
+
+@router.patch("/bulk/notes", status_code=status.HTTP_200_OK)
+def bulk_update_notes(notes: List[NoteBulkUpdate], db: Session = Depends(get_db)):
+    check_bulk_size(notes)
+    results = bulk_update(db, Note, [note.model_dump(exclude_unset=True) for note in notes])
+    return {"message": "Bulk Update Finished", "results": results}
+
+
+@router.delete("/bulk/notes", status_code=status.HTTP_200_OK)
+def bulk_delete_notes(payload: BulkDelete, db: Session = Depends(get_db)):
+    check_bulk_size(payload.ids)
+    results = bulk_delete(db, Note, payload.ids)
+    return {"message": "Bulk Delete Finished", "results": results}
\ No newline at end of file
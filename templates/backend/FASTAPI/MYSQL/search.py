@@ -0,0 +1,70 @@
+import base64
+import binascii
+import re
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+from models import Note
+from pagination import encode_cursor
+
+# Full-text search for /search-notes over the InnoDB FULLTEXT index on (title, content) (see models.py).
+# MATCH ... AGAINST in natural language mode takes the words as typed, with no operators to get wrong,
+# and returns a relevance score. MySQL evaluates the MATCH in SELECT, WHERE and ORDER BY once per row.
+# Words shorter than innodb_ft_min_token_size (3) and InnoDB stopwords are not indexed and match nothing.
+# MySQL has no ts_headline, so the snippet is cut from content here, for the rows of the page only;
+# it is the note's own text with <mark> around the matches and is not HTML-escaped.
+#
+# Results are ordered by relevance, which no index holds: each page ranks every match and keeps the
+# best ones, so the cursor is an offset and pages stop at MAX_SEARCH_OFFSET. A selective query
+# costs the same on a large table as on a small one; a word found in most notes ranks most of them.
+MAX_QUERY_LENGTH = 200
+MAX_SEARCH_OFFSET = 1000
+SNIPPET_LENGTH = 160
+
+
+def decode_offset(cursor):
+    if not cursor:
+        return 0
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, binascii.Error):
+        offset = -1
+    if not 0 <= offset <= MAX_SEARCH_OFFSET:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return offset
+
+
+def search_statement(q, limit, offset):
+    relevance = match(Note.title, Note.content, against=q).in_natural_language_mode()
+    return (
+        select(Note.id, Note.title, Note.content, relevance.label("rank"))
+        .where(relevance)
+        .order_by(relevance.desc(), Note.id)
+        .offset(offset)
+        .limit(limit + 1)
+    )
+
+
+# About SNIPPET_LENGTH characters of text around the first query word, with every query word marked
+def make_snippet(text, q):
+    words = [re.escape(word) for word in re.findall(r"\w+", q)]
+    if not words:
+        return text[:SNIPPET_LENGTH]
+    pattern = re.compile(r"\b(?:" + "|".join(words) + r")\w*", re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(first.start() - SNIPPET_LENGTH // 4, 0) if first else 0
+    snippet = pattern.sub(r"<mark>\g<0></mark>", text[start:start + SNIPPET_LENGTH])
+    return ("..." if start else "") + snippet + ("..." if start + SNIPPET_LENGTH < len(text) else "")
+
+
+# Rows are fetched with limit + 1, like the list routes, to know whether another page exists
+def search_page(rows, q, limit, offset):
+    results = [
+        {"id": row.id, "title": row.title, "snippet": make_snippet(row.content, q), "rank": row.rank}
+        for row in rows[:limit]
+    ]
+    more = len(rows) > limit and offset + limit <= MAX_SEARCH_OFFSET
+    return results, encode_cursor(offset + limit) if more else None
@@ -0,0 +1,59 @@
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# APP_ENV=development (default) runs uvicorn with hot reload, exactly like `python main.py`.
+# APP_ENV=production runs gunicorn with the settings in gunicorn.conf.py and N uvicorn workers.
+APP_ENV = os.getenv("APP_ENV", "development")
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "5000"))
+
+MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "true").lower() == "true"
+
+def run_migrations():
+    # Once, before any server process starts, and in a child process so that neither this process
+    # nor the gunicorn master it becomes holds on to the migration's connections (see migrate.py)
+    if subprocess.run([sys.executable, "migrate.py"]).returncode != 0:
+        sys.exit("Migrations failed; the server was not started.")
+
+
+def run_development():
+    import uvicorn
+    uvicorn.run("main:app", host=HOST, port=PORT, reload=True)
+
+
+def run_production():
+    if sys.platform == "win32":
+        # gunicorn is POSIX only; fall back to uvicorn's own multi-process supervisor.
+        # Workers share metrics through files, as under gunicorn (see gunicorn.conf.py).
+        metrics_dir = os.environ.setdefault(
+            "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "autostack-metrics")
+        )
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+        import uvicorn
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            workers=int(os.getenv("WEB_CONCURRENCY") or 0) or multiprocessing.cpu_count(),
+            backlog=int(os.getenv("GUNICORN_BACKLOG", "2048")),
+            timeout_keep_alive=int(os.getenv("GUNICORN_KEEPALIVE", "5")),
+        )
+        return
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"])
+
+
+if __name__ == "__main__":
+    if MIGRATE_ON_START:
+        run_migrations()
+    if APP_ENV == "production":
+        run_production()
+    else:
+        run_development()
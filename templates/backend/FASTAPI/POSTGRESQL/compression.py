@@ -0,0 +1,181 @@
+import os
+import zlib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Response compression for JSON and NDJSON bodies: zstd, br (brotli) or gzip, whichever the client's
+# Accept-Encoding ranks highest, COMPRESSION's order breaking ties. Bodies under COMPRESSION_MIN_SIZE
+# bytes are sent as they are; a small body doesn't shrink enough to pay for the CPU time.
+# Streamed responses (/export-*) are compressed chunk by chunk and flushed after each one, so rows
+# still reach the client as they are read.
+#
+# The middleware sits outside the response cache and conditional GET: cache entries stay
+# uncompressed and one entry serves every encoding. A compressed response's ETag is made weak
+# (W/"..."), because its bytes differ from the uncompressed one; If-None-Match accepts either form.
+
+# Encodings to offer, in order of preference; empty turns compression off
+COMPRESSION = [name.strip() for name in os.getenv("COMPRESSION", "zstd,br,gzip").lower().split(",") if name.strip()]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Defaults are the usual settings for dynamic responses: most of the size gain at a fraction of the
+# top levels' CPU time (gzip 1-9, br 0-11, zstd 1-22)
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_LEVEL = int(os.getenv("BROTLI_LEVEL", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+COMPRESSIBLE_TYPES = (b"application/json", b"application/x-ndjson", b"text/")
+
+
+class GzipEncoder:
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        import brotli
+        self.compressor = brotli.Compressor(quality=BROTLI_LEVEL)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self):
+        import zstandard
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(self.flush_block)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+ENCODERS = {"zstd": ZstdEncoder, "br": BrotliEncoder, "gzip": GzipEncoder}
+ENCODINGS = [name for name in COMPRESSION if name in ENCODERS]
+
+
+def choose_encoding(accept_encoding):
+    # The offered encoding with the highest q-value in Accept-Encoding, or None for no compression
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip()] = q
+    best, best_q = None, 0.0
+    for name in ENCODINGS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body, encoding):
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(body) + encoder.finish()
+
+
+class CompressionMiddleware:
+    # Pure ASGI middleware. The response start is held until the first body message shows whether the
+    # body is whole (compressed in one go, if large enough) or the first chunk of a stream.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENCODINGS or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1"))
+        start = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                if compressible(message):
+                    start = message
+                else:
+                    await send(message)
+                return
+            if start is None:
+                if encoder is not None and message["type"] == "http.response.body":
+                    more_body = message.get("more_body", False)
+                    body = encoder.compress(message.get("body", b""))
+                    message = {**message, "body": body + (encoder.flush() if more_body else encoder.finish())}
+                await send(message)
+                return
+
+            first, start = start, None
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not more_body and len(body) < COMPRESSION_MIN_SIZE:
+                await send(first)
+                await send(message)
+                return
+            headers = add_vary(first["headers"])
+            if encoding is None:
+                await send({**first, "headers": headers})
+                await send(message)
+                return
+
+            headers = [(name, value) for name, value in headers if name not in (b"content-length", b"etag")]
+            headers += [(b"content-encoding", encoding.encode())] + weak_etag(first["headers"])
+            if more_body:
+                encoder = ENCODERS[encoding]()
+                body = encoder.compress(body) + encoder.flush()
+            else:
+                body = compress(body, encoding)
+                headers.append((b"content-length", str(len(body)).encode()))
+            await send({**first, "headers": headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def compressible(start):
+    status = start["status"]
+    if status < 200 or status in (204, 304):
+        return False
+    headers = dict(start.get("headers", []))
+    if b"content-encoding" in headers or b"no-transform" in headers.get(b"cache-control", b""):
+        return False
+    return headers.get(b"content-type", b"").startswith(COMPRESSIBLE_TYPES)
+
+
+def add_vary(headers):
+    # The body depends on Accept-Encoding from here on, so shared caches must key on it
+    values = [value.strip() for name, value in headers if name == b"vary" for value in value.split(b",")]
+    if not any(value.lower() in (b"accept-encoding", b"*") for value in values):
+        values.append(b"Accept-Encoding")
+    return [(name, value) for name, value in headers if name != b"vary"] + [(b"vary", b", ".join(values))]
+
+
+def weak_etag(headers):
+    return [(b"etag", value if value.startswith(b"W/") else b"W/" + value) for name, value in headers if name == b"etag"]
@@ -0,0 +1,118 @@
+import os
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from starlette.routing import Match
+
+# Prometheus metrics, served at /metrics (see routes.py). Under gunicorn every worker writes its
+# samples to PROMETHEUS_MULTIPROC_DIR (set up in gunicorn.conf.py) and /metrics merges them, so a
+# scrape sees the whole server no matter which worker answers it.
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum")
+REJECTED = Counter("http_requests_rejected_total", "Requests turned away by admission control", ["pool", "reason"])
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Database statement latency", ["operation"], buckets=DB_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool, including opening new ones",
+    buckets=DB_BUCKETS
+)
+
+
+def render_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def route_label(scope, routes):
+    # Label by route template (/update-users/{user_id}) so ids don't explode the series count.
+    # Requests answered by an outer middleware (cache hit, 304) never reach the router, so match here.
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        for route in routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return route.path
+        return "unmatched"
+    return path
+
+
+class MetricsMiddleware:
+    # Pure ASGI middleware: request count, latency and in-flight gauge for every HTTP request
+    # routes: the APIRouter routes from routes.py, used to label requests the router never saw
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_label(scope, self.routes)
+            REQUEST_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
+            REQUESTS.labels(scope["method"], route, str(status)).inc()
+            IN_FLIGHT.dec()
+
+
+# SQLAlchemy: time every statement on every engine (the async engine runs on a sync Engine too)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    operation = statement.lstrip().split(" ", 1)[0].upper()
+    DB_QUERY_LATENCY.labels(operation).observe(elapsed)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.execution_context is not None and context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_sqlalchemy():
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+# Pool classes that time checkouts; config.py passes them as poolclass
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
@@ -0,0 +1,29 @@
+from logging.config import fileConfig
+from alembic import context
+from config import DATABASE_URL, Base, engine
+import models  # registers the tables on Base.metadata
+
+config = context.config
+target_metadata = Base.metadata
+
+fileConfig(config.config_file_name)
+
+
+def run_migrations_offline():
+    # alembic upgrade head --sql: print the DDL instead of running it
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
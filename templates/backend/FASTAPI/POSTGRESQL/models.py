@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Computed, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from config import Base
 
 class User(Base):
     __tablename__ = "user"
-    
-    id = Column(Integer, primary_key=True, index=True)
+    # Keyset pages (WHERE id > :cursor ORDER BY id) walk the primary key. ix_user_keyset carries
+    # username and email as INCLUDE columns, so PostgreSQL can serve a page from the index alone.
+    # email's unique constraint is also the index lookups by email use.
+    __table_args__ = (Index("ix_user_keyset", "id", postgresql_include=["username", "email"]),)
+
+    id = Column(Integer, primary_key=True)
     username = Column(String(80), unique=True, nullable=False, index=True)
     email = Column(String(120), unique=True, nullable=False)
 
@@ -18,14 +24,33 @@ class User(Base):
 
 class Note(Base):
     __tablename__ = "note"
-    
-    id = Column(Integer, primary_key=True, index=True)
+    # /search-notes matches search_vector through the GIN index ix_note_search. PostgreSQL keeps the
+    # column up to date from title (weight A) and content (weight B) on every write. It is deferred,
+    # so loading a Note never reads it, and eager_defaults is off, so inserts and updates don't
+    # RETURN it either.
+    __table_args__ = (Index("ix_note_search", "search_vector", postgresql_using="gin"),)
+    __mapper_args__ = {"eager_defaults": False}
+
+    id = Column(Integer, primary_key=True)
     title = Column(String(80), unique=True, nullable=False, index=True)
-    content = Column(String(120), unique=True, nullable=False)
+    # Free text: not unique and not B-tree indexed, a B-tree over it would only slow down every write
+    content = Column(Text, nullable=False)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', content), 'B')",
+        persisted=True,
+    )))
 
     def to_json(self):
         return {
             "id": self.id,
             "title": self.title,
             "content": self.content
-        }
\ No newline at end of file
+        }
+
+
+# One row per table; etag is replaced after every successful write (conditional GET, see main.py)
+class TableVersion(Base):
+    __tablename__ = "table_version"
+
+    name = Column(String(40), primary_key=True)
+    etag = Column(String(64), nullable=False)
\ No newline at end of file
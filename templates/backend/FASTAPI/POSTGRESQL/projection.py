@@ -0,0 +1,19 @@
+from fastapi import HTTPException, status
+
+# Field selection: ?fields=id,username on the list and export routes returns only those columns.
+# The routes select columns rather than entities (SELECT id, username FROM ...) and build each item
+# from the row, so no ORM objects are hydrated or tracked by the session. Without fields= every
+# column is selected. id is always included: the next page cursor is built from it.
+def select_columns(model, fields):
+    # Generated columns (note.search_vector, for /search-notes) are not part of the API
+    names = [column.name for column in model.__table__.columns if column.computed is None]
+    if fields:
+        requested = {name.strip() for name in fields.split(",")} - {""}
+        unknown = requested - set(names)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        names = [name for name in names if name == "id" or name in requested]
+    return [getattr(model, name) for name in names]
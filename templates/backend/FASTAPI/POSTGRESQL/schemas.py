@@ -1,4 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, conint
+from pagination import MAX_ID
+
+# Ids in bulk bodies must fit the INTEGER id column; anything else is a 422 before the driver sees it
+RowId = conint(gt=0, le=MAX_ID)
 
 # User Schemas
 class UserCreate(BaseModel):
@@ -9,13 +13,25 @@ class UserUpdate(BaseModel):
     username: str | None = None
     email: EmailStr | None = None
 
+class UserBulkUpdate(UserUpdate):
+    id: RowId
+
+# Response models for the read routes (see responses.py). from_attributes lets them validate ORM
+# objects and result rows directly. Fields left out by ?fields= are absent from the JSON, not null.
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
-    username: str
-    email: str
+    username: str | None = None
+    email: str | None = None
+
+class UserPage(BaseModel):
+    users: list[UserResponse]
+    next_cursor: str | None
 
-    class Config:
-        from_attributes = True
+class UserBatch(BaseModel):
+    users: list[UserResponse]
+    missing: list[int]
 
 
 # Note Schemas
@@ -27,10 +43,25 @@ class NoteUpdate(BaseModel):
     title: str | None = None
     content: str | None = None
 
+class NoteBulkUpdate(NoteUpdate):
+    id: RowId
+
 class NoteResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
-    title: str
-    content: str
+    title: str | None = None
+    content: str | None = None
+
+class NotePage(BaseModel):
+    notes: list[NoteResponse]
+    next_cursor: str | None
+
+class NoteBatch(BaseModel):
+    notes: list[NoteResponse]
+    missing: list[int]
+
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+# Bulk Schemas
+class BulkDelete(BaseModel):
+    ids: list[RowId]
\ No newline at end of file
@@ -0,0 +1,77 @@
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Bulk writes: one unordered insert_many / bulk_write / delete_many per request instead of a
+# round trip per document. Each helper returns a per-item status list in the order items were sent.
+MAX_BULK_ITEMS = 1000
+
+def _write_errors(error):
+    return {err["index"]: err["errmsg"] for err in error.details.get("writeErrors", [])}
+
+
+async def _existing_ids(collection, ids):
+    return {doc["_id"] async for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+
+
+async def bulk_insert(collection, docs):
+    failed = {}
+    try:
+        await collection.insert_many(docs, ordered=False)  # sets _id on each doc in place
+    except BulkWriteError as e:
+        failed = _write_errors(e)
+    return [
+        {"index": i, "status": "error", "message": failed[i]} if i in failed
+        else {"index": i, "id": str(doc["_id"]), "status": "created"}
+        for i, doc in enumerate(docs)
+    ]
+
+
+async def bulk_update(collection, rows):
+    results = [None] * len(rows)
+    pending = []
+    for i, row in enumerate(rows):
+        fields = {key: value for key, value in row.items() if key != "id"}
+        if not ObjectId.is_valid(row["id"]):
+            results[i] = {"index": i, "id": row["id"], "status": "invalid", "message": "Invalid ID"}
+        elif not fields:
+            results[i] = {"index": i, "id": row["id"], "status": "invalid", "message": "No data provided"}
+        else:
+            pending.append((i, ObjectId(row["id"]), fields))
+
+    found = await _existing_ids(collection, [oid for _, oid, _ in pending])
+    ops, op_rows = [], []
+    for i, oid, fields in pending:
+        if oid in found:
+            ops.append(UpdateOne({"_id": oid}, {"$set": fields}))
+            op_rows.append(i)
+        else:
+            results[i] = {"index": i, "id": rows[i]["id"], "status": "not_found"}
+
+    failed = {}
+    if ops:
+        try:
+            await collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            failed = _write_errors(e)
+    for op_index, i in enumerate(op_rows):
+        if op_index in failed:
+            results[i] = {"index": i, "id": rows[i]["id"], "status": "error", "message": failed[op_index]}
+        else:
+            results[i] = {"index": i, "id": rows[i]["id"], "status": "updated"}
+    return results
+
+
+async def bulk_delete(collection, ids):
+    oids = [ObjectId(id_) for id_ in ids if ObjectId.is_valid(id_)]
+    found = await _existing_ids(collection, oids)
+    if found:
+        await collection.delete_many({"_id": {"$in": list(found)}})
+
+    results = []
+    for i, id_ in enumerate(ids):
+        if not ObjectId.is_valid(id_):
+            results.append({"index": i, "id": id_, "status": "invalid", "message": "Invalid ID"})
+        else:
+            results.append({"index": i, "id": id_, "status": "deleted" if ObjectId(id_) in found else "not_found"})
+    return results
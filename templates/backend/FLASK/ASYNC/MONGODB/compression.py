@@ -0,0 +1,155 @@
+import os
+import zlib
+from dotenv import load_dotenv
+from quart import Response, request
+from quart.wrappers.response import DataBody, IterableBody
+
+load_dotenv()
+
+# Response compression for JSON and NDJSON bodies: zstd, br (brotli) or gzip, whichever the client's
+# Accept-Encoding ranks highest, COMPRESSION's order breaking ties. Bodies under COMPRESSION_MIN_SIZE
+# bytes are sent as they are; a small body doesn't shrink enough to pay for the CPU time.
+# Streamed responses (/export-*) are compressed chunk by chunk and flushed after each one, so rows
+# still reach the client as they are read.
+#
+# The hook runs after the response cache and conditional GET hooks: cache entries stay
+# uncompressed and one entry serves every encoding. A compressed response's ETag is made weak
+# (W/"..."), because its bytes differ from the uncompressed one; If-None-Match accepts either form.
+
+# Encodings to offer, in order of preference; empty turns compression off
+COMPRESSION = [name.strip() for name in os.getenv("COMPRESSION", "zstd,br,gzip").lower().split(",") if name.strip()]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Defaults are the usual settings for dynamic responses: most of the size gain at a fraction of the
+# top levels' CPU time (gzip 1-9, br 0-11, zstd 1-22)
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_LEVEL = int(os.getenv("BROTLI_LEVEL", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class GzipEncoder:
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        import brotli
+        self.compressor = brotli.Compressor(quality=BROTLI_LEVEL)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self):
+        import zstandard
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(self.flush_block)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+ENCODERS = {"zstd": ZstdEncoder, "br": BrotliEncoder, "gzip": GzipEncoder}
+ENCODINGS = [name for name in COMPRESSION if name in ENCODERS]
+
+
+def choose_encoding(accept_encoding):
+    # The offered encoding with the highest q-value in Accept-Encoding, or None for no compression
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip()] = q
+    best, best_q = None, 0.0
+    for name in ENCODINGS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body, encoding):
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(body) + encoder.finish()
+
+
+def init_compression(app):
+    # Register this before init_conditional_get() and init_cache(): after_request hooks run in reverse
+    # order, so it sees their final response
+    if not ENCODINGS:
+        return
+
+    @app.after_request
+    async def compress_response(response):
+        if request.method == "HEAD" or not compressible(response):
+            return response
+        streamed = not isinstance(response.response, DataBody)
+        if not streamed and len(await response.get_data()) < COMPRESSION_MIN_SIZE:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if streamed:
+            response.response = IterableBody(compress_chunks(response.response, ENCODERS[encoding]()))
+            del response.headers["Content-Length"]
+        else:
+            response.set_data(compress(await response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def compressible(response):
+    if not isinstance(response, Response):
+        return False  # Werkzeug's HTTP error pages, sent as they are
+    status = response.status_code
+    if status < 200 or status in (204, 304):
+        return False
+    if "Content-Encoding" in response.headers or response.cache_control.no_transform:
+        return False
+    return (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+
+
+async def compress_chunks(body, encoder):
+    # Streamed bodies: every chunk is flushed, so the client gets each one as soon as it is produced
+    async with body as chunks:
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                yield encoder.compress(chunk) + encoder.flush()
+    yield encoder.finish()
@@ -0,0 +1,6 @@
+from config import app
+from routes import *
+
+if __name__ == "__main__":
+    # Indexes are created by config.startup (before_serving), here and under gunicorn alike
+    app.run(debug=True, port=5000)
@@ -0,0 +1,59 @@
+import base64
+import binascii
+from bson import ObjectId
+from quart import request
+
+# Keyset pagination: clients pass back the opaque cursor from the previous page
+# and we resume with {"_id": {"$gt": last_id}} sorted by _id, which walks the default _id index.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        last_id = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (ValueError, binascii.Error):
+        last_id = None
+    if not last_id or not ObjectId.is_valid(last_id):
+        raise ValueError("Invalid cursor")
+    return ObjectId(last_id)
+
+
+# Reads ?limit=&cursor= from the current request. Raises ValueError on bad input
+def page_args():
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE), decode_cursor(request.args.get("cursor"))
+
+
+# Reads ?ids=a,b,c (batch reads) from the current request: at most MAX_PAGE_SIZE ids, repeats
+# dropped, in the order they were asked for. Raises ValueError on bad input
+def ids_arg():
+    ids = request.args.get("ids")
+    if not ids:
+        raise ValueError("ids is required")
+    values = ids.split(",")
+    if not all(ObjectId.is_valid(value) for value in values):
+        raise ValueError("Invalid id")
+    if len(values) > MAX_PAGE_SIZE:
+        raise ValueError(f"At most {MAX_PAGE_SIZE} ids per request")
+    return [ObjectId(value) for value in dict.fromkeys(values)]
+
+# Documents are fetched with limit + 1 so we know whether another page exists without a count
+def paginate(docs, limit, key):
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(key(docs[-1]))
+    return docs, None
+
+
+# Lines the documents of an _id $in query up with the requested ids: (docs, missing ids)
+def order_by_ids(ids, items, key):
+    by_id = {key(item): item for item in items}
+    return [by_id[id_] for id_ in ids if id_ in by_id], [id_ for id_ in ids if id_ not in by_id]
@@ -0,0 +1,374 @@
+from quart import abort, request, jsonify, Response, stream_with_context
+from config import app, db, read_db
+from models import USER_FIELDS, NOTE_FIELDS, serialize_user, serialize_note
+from bulk import MAX_BULK_ITEMS, bulk_insert, bulk_update, bulk_delete
+from cache import response_cache
+from metrics import CONTENT_TYPE_LATEST, render_metrics
+from pagination import ids_arg, order_by_ids, page_args, paginate
+from projection import projection_args
+from search import search_args, search_cursor, search_page
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+EXPORT_BATCH_SIZE = 1000
+
+# Streams a collection as NDJSON straight off the Motor cursor, flushing every EXPORT_BATCH_SIZE docs
+async def export_ndjson(collection, serialize, fields, projection):
+    buffer = []
+    async for doc in collection.find({}, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE):
+        buffer.append(app.json.dumps(serialize(doc, fields)) + "\n")
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+# Quart's get_json() returns None for a body that isn't JSON; answer 415 like Flask's request.json
+async def json_body():
+    if not request.is_json:
+        abort(415)
+    return await request.get_json()
+
+def check_bulk_payload(items):
+    if not isinstance(items, list) or not items:
+        return "Expected a non-empty JSON array"
+    if len(items) > MAX_BULK_ITEMS:
+        return f"At most {MAX_BULK_ITEMS} items per bulk request"
+
+@app.route("/autostack", methods=["GET"]) 
+async def autostack():
+    message = """ 
+        Congrats! You have successfully set up your full-stack project!
+        If you're reading this message, it means your frontend and backend are completely connected!
+        You are ready to create your next big project!
+"""
+    return jsonify({"message": message, "backend": "Flask", "database": "MongoDB", "filepath": 'backend/main.py'}), 200
+
+@app.route("/cache-stats", methods=["GET"])
+async def cache_stats():
+    # Hit/miss counters of this worker process
+    return jsonify(response_cache.stats()), 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text format; merges all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set.
+    # A plain def, so Quart reads the per-worker files on a thread instead of the event loop.
+    return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+# Example User REST APIs
+@app.route("/get-users", methods=["GET"])
+async def get_users():
+    try:
+        limit, last_id = page_args()
+        fields, projection = projection_args(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    query = {}
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+    docs = await read_db.users.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    users, next_cursor = paginate(docs, limit, lambda d: d["_id"])
+    json_users = [serialize_user(u, fields) for u in users]
+    return jsonify({"users": json_users, "next_cursor": next_cursor}), 200
+
+@app.route("/export-users", methods=["GET"])
+async def export_users():
+    try:
+        fields, projection = projection_args(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(stream_with_context(export_ndjson)(read_db.users, serialize_user, fields, projection), mimetype="application/x-ndjson")
+
+@app.route("/users/<user_id>", methods=["GET"])
+async def get_user(user_id):
+    if not ObjectId.is_valid(user_id):
+        return jsonify({"message": "Invalid user id"}), 400
+
+    # find_one on _id is a point lookup on the default _id index
+    doc = await db.users.find_one({"_id": ObjectId(user_id)})
+    if doc is None:
+        return jsonify({"message": "User not found"}), 404
+    return jsonify(serialize_user(doc)), 200
+
+@app.route("/users", methods=["GET"])
+async def get_users_by_ids():
+    try:
+        user_ids = ids_arg()
+        fields, projection = projection_args(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # One {"_id": {"$in": [...]}} query for the whole batch; items come back in the order of ?ids=
+    docs = await db.users.find({"_id": {"$in": user_ids}}, projection).to_list(length=len(user_ids))
+    docs, missing = order_by_ids(user_ids, docs, lambda d: d["_id"])
+    return jsonify({"users": [serialize_user(d, fields) for d in docs], "missing": missing}), 200
+
+@app.route("/create-user", methods=["POST"])
+async def create_user():
+    data = await json_body()
+    username = data.get("username")
+    email = data.get("email")
+    if not username or not email:
+        return jsonify({"message": "Missing fields"}), 400
+
+    # uniqueness is enforced by the unique indexes created in config.ensure_indexes
+    try:
+        res = await db.users.insert_one({"username": username, "email": email})
+    except DuplicateKeyError:
+        return jsonify({"message": "User with same username or email already exists"}), 400
+    return jsonify({"message": "New User Created", "id": str(res.inserted_id)}), 201
+
+
+@app.route("/update-users/<user_id>", methods=["PATCH"])
+async def update_user(user_id):
+    try:
+        _id = ObjectId(user_id)
+    except Exception:
+        return jsonify({"message": "Invalid user id"}), 400
+
+    data = await json_body()
+    if not data:
+        return jsonify({"message": "No data provided"}), 400
+
+    update = {}
+    if "username" in data:
+        update["username"] = data["username"]
+    if "email" in data:
+        update["email"] = data["email"]
+
+    if not update:
+        return jsonify({"message": "No valid fields to update"}), 400
+
+    try:
+        result = await db.users.update_one({"_id": _id}, {"$set": update})
+    except DuplicateKeyError:
+        return jsonify({"message": "User with same username or email already exists"}), 400
+    if result.matched_count == 0:
+        return jsonify({"message": "User not found"}), 404
+
+    return jsonify({"message": "User Updated"}), 200
+
+
+@app.route("/delete-user/<user_id>", methods=["DELETE"])
+async def delete_user(user_id):
+    try:
+        _id = ObjectId(user_id)
+    except Exception:
+        return jsonify({"message": "Invalid user id"}), 400
+
+    result = await db.users.delete_one({"_id": _id})
+    if result.deleted_count == 0:
+        return jsonify({"message": "User not found"}), 404
+
+    return jsonify({"message": "User Deleted"}), 200
+
+
+# Bulk User APIs
+@app.route("/bulk/users", methods=["POST"])
+async def bulk_create_users():
+    data = await json_body()
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not item.get("username") or not item.get("email") for item in data):
+        return jsonify({"message": "Missing fields"}), 400
+
+    rows = [{"username": item["username"], "email": item["email"]} for item in data]
+    results = await bulk_insert(db.users, rows)
+    return jsonify({"message": "Bulk Create Finished", "results": results}), 200
+
+
+@app.route("/bulk/users", methods=["PATCH"])
+async def bulk_update_users():
+    data = await json_body()
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not isinstance(item.get("id"), str) for item in data):
+        return jsonify({"message": "Missing or invalid user id"}), 400
+
+    rows = [
+        {"id": item["id"], **{key: item[key] for key in ("username", "email") if key in item}}
+        for item in data
+    ]
+    results = await bulk_update(db.users, rows)
+    return jsonify({"message": "Bulk Update Finished", "results": results}), 200
+
+
+@app.route("/bulk/users", methods=["DELETE"])
+async def bulk_delete_users():
+    ids = (await json_body() or {}).get("ids")
+    error = check_bulk_payload(ids)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(id_, str) for id_ in ids):
+        return jsonify({"message": "Missing or invalid user id"}), 400
+
+    results = await bulk_delete(db.users, ids)
+    return jsonify({"message": "Bulk Delete Finished", "results": results}), 200
+
+
+# Example Notes REST APIs
+@app.route("/get-notes", methods=["GET"])
+async def get_notes():
+    try:
+        limit, last_id = page_args()
+        fields, projection = projection_args(NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    query = {}
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+    docs = await read_db.notes.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    notes, next_cursor = paginate(docs, limit, lambda d: d["_id"])
+    json_notes = [serialize_note(n, fields) for n in notes]
+    return jsonify({"notes": json_notes, "next_cursor": next_cursor}), 200
+
+@app.route("/export-notes", methods=["GET"])
+async def export_notes():
+    try:
+        fields, projection = projection_args(NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(stream_with_context(export_ndjson)(read_db.notes, serialize_note, fields, projection), mimetype="application/x-ndjson")
+
+@app.route("/search-notes", methods=["GET"])
+async def search_notes():
+    # Ranked full-text search over title and content (see search.py)
+    try:
+        q, limit, offset = search_args()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    docs = await search_cursor(read_db.notes, q, limit, offset).to_list(length=limit + 1)
+    notes, next_cursor = search_page(docs, q, limit, offset)
+    return jsonify({"notes": notes, "next_cursor": next_cursor}), 200
+
+@app.route("/notes/<note_id>", methods=["GET"])
+async def get_note(note_id):
+    if not ObjectId.is_valid(note_id):
+        return jsonify({"message": "Invalid note id"}), 400
+
+    # find_one on _id is a point lookup on the default _id index
+    doc = await db.notes.find_one({"_id": ObjectId(note_id)})
+    if doc is None:
+        return jsonify({"message": "Note not found"}), 404
+    return jsonify(serialize_note(doc)), 200
+
+@app.route("/notes", methods=["GET"])
+async def get_notes_by_ids():
+    try:
+        note_ids = ids_arg()
+        fields, projection = projection_args(NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # One {"_id": {"$in": [...]}} query for the whole batch; items come back in the order of ?ids=
+    docs = await db.notes.find({"_id": {"$in": note_ids}}, projection).to_list(length=len(note_ids))
+    docs, missing = order_by_ids(note_ids, docs, lambda d: d["_id"])
+    return jsonify({"notes": [serialize_note(d, fields) for d in docs], "missing": missing}), 200
+
+@app.route("/create-note", methods=["POST"])
+async def create_note():
+    data = await json_body()
+    title = data.get("title")
+    content = data.get("content")
+    if not title or not content:
+        return jsonify({"message": "Missing fields"}), 400
+
+    try:
+        res = await db.notes.insert_one({"title": title, "content": content})
+    except DuplicateKeyError:
+        return jsonify({"message": "Note with same title already exists"}), 400
+    return jsonify({"message": "New Note Created", "id": str(res.inserted_id)}), 201
+
+
+@app.route("/update-notes/<note_id>", methods=["PATCH"])
+async def update_note(note_id):
+    try:
+        _id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"message": "Invalid note id"}), 400
+
+    data = await json_body()
+    if not data:
+        return jsonify({"message": "No data provided for updation"}), 400
+
+    update = {}
+    if "title" in data:
+        update["title"] = data["title"]
+    if "content" in data:
+        update["content"] = data["content"]
+
+    if not update:
+        return jsonify({"message": "No valid fields to update"}), 400
+
+    try:
+        result = await db.notes.update_one({"_id": _id}, {"$set": update})
+    except DuplicateKeyError:
+        return jsonify({"message": "Note with same title already exists"}), 400
+    if result.matched_count == 0:
+        return jsonify({"message": "Note not found"}), 404
+
+    return jsonify({"message": "Note Updated"}), 200
+
+
+@app.route("/delete-note/<note_id>", methods=["DELETE"])
+async def delete_note(note_id):
+    try:
+        _id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"message": "Invalid note id"}), 400
+
+    result = await db.notes.delete_one({"_id": _id})
+    if result.deleted_count == 0:
+        return jsonify({"message": "Note not found"}), 404
+
+    return jsonify({"message": "Note Deleted"}), 200
+
+
+# Bulk Note APIs
+@app.route("/bulk/notes", methods=["POST"])
+async def bulk_create_notes():
+    data = await json_body()
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not item.get("title") or not item.get("content") for item in data):
+        return jsonify({"message": "Missing fields"}), 400
+
+    rows = [{"title": item["title"], "content": item["content"]} for item in data]
+    results = await bulk_insert(db.notes, rows)
+    return jsonify({"message": "Bulk Create Finished", "results": results}), 200
+
+
+@app.route("/bulk/notes", methods=["PATCH"])
+async def bulk_update_notes():
+    data = await json_body()
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not isinstance(item.get("id"), str) for item in data):
+        return jsonify({"message": "Missing or invalid note id"}), 400
+
+    rows = [
+        {"id": item["id"], **{key: item[key] for key in ("title", "content") if key in item}}
+        for item in data
+    ]
+    results = await bulk_update(db.notes, rows)
+    return jsonify({"message": "Bulk Update Finished", "results": results}), 200
+
+
+@app.route("/bulk/notes", methods=["DELETE"])
+async def bulk_delete_notes():
+    ids = (await json_body() or {}).get("ids")
+    error = check_bulk_payload(ids)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(id_, str) for id_ in ids):
+        return jsonify({"message": "Missing or invalid note id"}), 400
+
+    results = await bulk_delete(db.notes, ids)
+    return jsonify({"message": "Bulk Delete Finished", "results": results}), 200
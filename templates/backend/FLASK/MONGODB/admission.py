@@ -0,0 +1,227 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from flask import g, jsonify, request
+from metrics import REJECTED
+
+load_dotenv()
+
+# Admission control: every request joins a pool chosen by its route (route_pool below). A pool runs
+# at most `limit` requests at once and lets up to `queue` more wait ADMISSION_QUEUE_TIMEOUT_MS for a
+# slot; the rest get 503 with Retry-After right away, before they touch the database. When the
+# database slows down, the excess fails fast instead of holding every worker thread and making
+# every request slow. Separate pools keep writes, bulk requests and exports from taking the threads
+# cheap reads need. Limits are per worker process, which runs GUNICORN_THREADS requests at once, so
+# the defaults are sized for its 4 threads. A waiting request holds its thread: keep queues short.
+#
+# RATE_LIMITS adds a token bucket per client and pool: `rate` requests per second on average, bursts
+# of up to `burst`. A client over it gets 429 with Retry-After. RATE_LIMIT_BACKEND=memory keeps the
+# buckets in each worker, so a client's budget is per worker; redis shares them between workers.
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "false").lower() == "true"
+# pool=limit/queue, for every pool route_pool can return; a pool left out is not limited
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS") or "read=4/4,search=2/2,write=2/2,bulk=1/1,export=1/1"
+ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000"))
+ADMISSION_RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")
+# pool=rate/burst; empty turns rate limiting off
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+# Header that identifies the client (X-API-Key, or X-Forwarded-For behind a proxy that sets it);
+# empty uses the client address
+RATE_LIMIT_KEY_HEADER = os.getenv("RATE_LIMIT_KEY_HEADER", "")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+KEY_PREFIX = "autostack"
+
+# Routes with a pool of their own, by path prefix; other reads are "read" and other writes "write"
+ROUTE_POOLS = (
+    ("/bulk/", "bulk"),
+    ("/export-", "export"),
+    ("/search-notes", "search"),
+)
+# Always admitted, so monitoring keeps working under overload
+EXEMPT_PATHS = {"/", "/metrics", "/cache-stats"}
+
+
+def route_pool(method, path):
+    if path in EXEMPT_PATHS:
+        return None
+    for prefix, pool in ROUTE_POOLS:
+        if path.startswith(prefix):
+            return pool
+    return "read" if method in ("GET", "HEAD") else "write"
+
+
+def parse_limits(setting, spec, number, valid, requirement):
+    # "read=32/64,write=8/32" -> {"read": (32, 64), "write": (8, 32)}. A pair that is not a number or
+    # fails valid() stops the worker at import, instead of failing every request of its pool later.
+    limits = {}
+    for item in spec.split(","):
+        if item.strip():
+            name, _, values = item.partition("=")
+            first, _, second = values.partition("/")
+            try:
+                pair = (number(first), number(second or first))
+            except ValueError:
+                pair = None
+            if pair is None or not valid(*pair):
+                raise ValueError(f"{setting}: {item.strip()!r} needs {requirement}; leave a pool out to not limit it")
+            limits[name.strip()] = pair
+    return limits
+
+
+class Pool:
+    # Running requests hold a semaphore slot; waiting ones are counted so the queue stays bounded
+    def __init__(self, limit, queue):
+        self.slots = threading.Semaphore(limit)
+        self.queue = queue
+        self.waiting = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # None once admitted, otherwise why the request was turned away
+        if self.slots.acquire(blocking=False):
+            return None
+        with self.lock:
+            if self.waiting >= self.queue:
+                return "queue_full"
+            self.waiting += 1
+        try:
+            if not self.slots.acquire(timeout=ADMISSION_QUEUE_TIMEOUT_MS / 1000):
+                return "queue_timeout"
+        finally:
+            with self.lock:
+                self.waiting -= 1
+        return None
+
+    def release(self):
+        self.slots.release()
+
+
+class MemoryBuckets:
+    # Per-process token buckets: (tokens, updated_at) per key, the least recently seen client evicted first
+    def __init__(self, max_clients):
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        # 0 when a token was taken, otherwise the seconds until the next one
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated = self.buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+# The same bucket in Redis, updated atomically in one round trip. A bucket refills completely in
+# burst / rate seconds, so the key expires after that.
+TAKE_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    def __init__(self, url):
+        import redis
+        self.script = redis.Redis.from_url(url).register_script(TAKE_SCRIPT)
+
+    def take(self, key, rate, burst):
+        return float(self.script(keys=[key], args=[rate, burst, time.time()]))
+
+
+POOLS = {
+    name: Pool(limit, queue)
+    for name, (limit, queue) in parse_limits(
+        "ADMISSION_LIMITS", ADMISSION_LIMITS, int,
+        lambda limit, queue: limit >= 1 and queue >= 0, "limit/queue with a limit of at least 1",
+    ).items()
+} if ADMISSION_CONTROL else {}
+RATES = parse_limits(
+    "RATE_LIMITS", RATE_LIMITS, float,
+    lambda rate, burst: rate > 0 and burst >= 1, "rate/burst with a rate above 0 and a burst of at least 1",
+)
+
+
+def create_buckets():
+    if not RATES:
+        return None
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBuckets(REDIS_URL)
+    return MemoryBuckets(RATE_LIMIT_MAX_CLIENTS)
+
+
+buckets = create_buckets()
+
+
+def client_key():
+    if RATE_LIMIT_KEY_HEADER:
+        value = request.headers.get(RATE_LIMIT_KEY_HEADER)
+        if value:
+            return value.split(",")[0].strip()
+    return request.remote_addr or "unknown"
+
+
+def reject(status, retry_after, message):
+    response = jsonify({"message": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def init_admission(app):
+    # Call right after init_metrics(app): rejected requests are still counted, and a rejection skips
+    # the hooks registered later (profiler, conditional GET, cache), which query the database.
+    # Rate limit first (cheap, per client), then a slot in the route's pool, released in teardown,
+    # after a streamed export has been sent.
+    if not POOLS and not RATES:
+        return
+
+    @app.before_request
+    def admit():
+        pool_name = route_pool(request.method, request.path)
+        if pool_name is None:
+            return None
+
+        rate = RATES.get(pool_name)
+        if rate is not None:
+            wait = buckets.take(f"{KEY_PREFIX}:rate:{pool_name}:{client_key()}", *rate)
+            if wait:
+                REJECTED.labels(pool_name, "rate_limited").inc()
+                return reject(429, math.ceil(wait), "Too many requests")
+
+        pool = POOLS.get(pool_name)
+        if pool is None:
+            return None
+        reason = pool.acquire()
+        if reason is not None:
+            REJECTED.labels(pool_name, reason).inc()
+            return reject(503, ADMISSION_RETRY_AFTER, "Server is busy, try again later")
+        g.admission_pool = pool
+        return None
+
+    @app.teardown_request
+    def release_slot(exc):
+        pool = g.pop("admission_pool", None)
+        if pool is not None:
+            pool.release()
@@ -1,13 +1,58 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
+from metrics import CommandMetrics, PoolMetrics, init_metrics
+from profiler import QUERY_PROFILER, ProfilerCommandListener, init_profiler
+from compression import init_compression
+from admission import init_admission
+from cache import init_cache, init_conditional_get
 import os
-from pymongo import MongoClient
+import secrets
+import orjson
+from bson import ObjectId
+from pymongo import TEXT, MongoClient, ReadPreference
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+# Request count, latency and in-flight gauge for /metrics; registered before the cache hooks
+init_metrics(app)
+# Admission control and rate limits (ADMISSION_CONTROL / RATE_LIMITS in .env): sheds excess requests
+# with 503 / 429 before the hooks and views below touch the database
+init_admission(app)
+# Development query profiler (QUERY_PROFILER in .env): Server-Timing header and N+1 / slow query warnings
+init_profiler(app)
+# Response compression (COMPRESSION in .env); registered before the cache hooks so it runs after them
+init_compression(app)
+
+# ObjectId is encoded by the JSON provider itself, so serializers can pass _id through untouched.
+# Opt-in fast JSON: FAST_JSON=true swaps Flask's json module for orjson in jsonify and app.json
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+def json_default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    default = staticmethod(json_default)
+
+
+class ORJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=json_default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=json_default), mimetype="application/json")
+
+app.json = ORJSONProvider(app) if FAST_JSON else MongoJSONProvider(app)
 
 # MongoDB settings (supports full MONGO_URI or components)
 MONGO_URI = os.getenv("MONGO_URI")
@@ -23,5 +68,71 @@ if not MONGO_URI:
     else:
         MONGO_URI = f"mongodb://{MDB_HOST}:{MDB_PORT}"
 
-client = MongoClient(MONGO_URI)
+# Driver pool and timeout settings (see .env). minPoolSize keeps warm connections open so
+# traffic bursts don't pay for new handshakes; compressors are negotiated with the server.
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = os.getenv("MONGO_MAX_IDLE_TIME_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+# Read preference for the list/export endpoints only; writes and single-document reads stay on the primary
+MONGO_LIST_READ_PREFERENCE = os.getenv("MONGO_LIST_READ_PREFERENCE", "primary")
+if MONGO_LIST_READ_PREFERENCE not in READ_PREFERENCES:
+    raise ValueError(
+        f"MONGO_LIST_READ_PREFERENCE must be one of {', '.join(READ_PREFERENCES)}, not {MONGO_LIST_READ_PREFERENCE!r}"
+    )
+
+client_options = {
+    "maxPoolSize": MONGO_MAX_POOL_SIZE,
+    "minPoolSize": MONGO_MIN_POOL_SIZE,
+    "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+}
+if MONGO_MAX_IDLE_TIME_MS:
+    client_options["maxIdleTimeMS"] = int(MONGO_MAX_IDLE_TIME_MS)
+if MONGO_COMPRESSORS:
+    client_options["compressors"] = MONGO_COMPRESSORS
+# Command latency and pool checkout time for /metrics
+client_options["event_listeners"] = [CommandMetrics(), PoolMetrics()]
+# Per-request command counts and N+1 / slow command warnings in development (see profiler.py)
+if QUERY_PROFILER:
+    client_options["event_listeners"].append(ProfilerCommandListener())
+
+client = MongoClient(MONGO_URI, **client_options)
 db = client[MDB_NAME]
+read_db = client.get_database(MDB_NAME, read_preference=READ_PREFERENCES[MONGO_LIST_READ_PREFERENCE])
+
+# Unique indexes enforce uniqueness in the database (no find-before-insert) and make lookups O(log n).
+# create_index is a no-op when the index already exists, so this is safe on every startup.
+# Called before a process serves (post_worker_init in gunicorn.conf.py, serve.py and main.py in
+# development) instead of on import, so importing the app does no network round trips.
+def ensure_indexes():
+    db.users.create_index("username", unique=True)
+    db.users.create_index("email", unique=True)
+    db.notes.create_index("title", unique=True)
+    # One text index per collection: /search-notes runs $text on it, title matches weighted above content
+    db.notes.create_index([("title", TEXT), ("content", TEXT)], weights={"title": 10, "content": 1}, name="notes_text")
+
+
+# Per-collection version tokens for conditional GET (see cache.py)
+def bump_version(table):
+    etag = f'"{table}-{secrets.token_hex(8)}"'
+    db.table_versions.update_one({"_id": table}, {"$set": {"etag": etag}}, upsert=True)
+    return etag
+
+def read_version(table):
+    version = db.table_versions.find_one({"_id": table})
+    # No row until the table's first write: a fixed token then, so a read never writes
+    return version["etag"] if version else f'"{table}-0"'
+
+# Response cache and conditional GET (CACHE_BACKEND / CONDITIONAL_GET in .env). The cache comes first
+# so a hit is served without reading the version token; CORS(app) was registered before both, so its
+# headers are still added to 304s and cached responses.
+init_cache(app)
+init_conditional_get(app, read_version, bump_version)
\ No newline at end of file
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Production process model: one gunicorn master supervising threaded Flask workers (see serve.py).
+# Send SIGHUP to the master for a graceful reload: new workers start before old ones drain.
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+# Sync views block on I/O, so run (2 x cores) + 1 processes with a few threads each.
+# GUNICORN_WORKER_CLASS=gevent switches to green threads (pip install gevent first).
+workers = int(os.getenv("WEB_CONCURRENCY") or 0) or multiprocessing.cpu_count() * 2 + 1
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))  # gevent only
+
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers periodically to cap slow memory growth; jitter avoids restarting all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+accesslog = "-"
+errorlog = "-"
+
+# /metrics merges every worker's samples through per-process files in this directory (see metrics.py).
+# It must be set before the app imports prometheus_client, so it is done here in the master.
+METRICS_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "autostack-metrics")
+)
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to this one
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def post_worker_init(worker):
+    # Once per worker, before it accepts requests (the FastAPI templates do this in their lifespan).
+    # An unreachable database fails the boot, which stops the master instead of looping on restarts.
+    from config import ensure_indexes
+    ensure_indexes()
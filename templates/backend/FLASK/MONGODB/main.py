@@ -2,4 +2,6 @@ from config import app, db
 from routes import *
 
 if __name__ == "__main__":
+    from config import ensure_indexes
+    ensure_indexes()
     app.run(debug=True, port=5000)
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from pymongo import monitoring
+from flask import g, request
+
+# Prometheus metrics, served at /metrics (see routes.py). Under gunicorn every worker writes its
+# samples to PROMETHEUS_MULTIPROC_DIR (set up in gunicorn.conf.py) and /metrics merges them, so a
+# scrape sees the whole server no matter which worker answers it.
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum")
+REJECTED = Counter("http_requests_rejected_total", "Requests turned away by admission control", ["pool", "reason"])
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Database command latency", ["operation"], buckets=DB_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool, including opening new ones",
+    buckets=DB_BUCKETS
+)
+
+
+def render_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def init_metrics(app):
+    # Call right after CORS(app): a before_request hook that returns early (cache hit, 304)
+    # stops the ones registered after it, and these must always run.
+    @app.before_request
+    def start_request_timer():
+        IN_FLIGHT.inc()
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request(exc):
+        # Runs even when the view raised, and only after a streamed body has been sent
+        if "metrics_start" not in g:
+            return
+        # Label by rule (/update-users/<int:user_id>) so ids don't explode the series count
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_LATENCY.labels(request.method, route).observe(time.perf_counter() - g.metrics_start)
+        REQUESTS.labels(request.method, route, str(g.get("metrics_status", 500))).inc()
+        IN_FLIGHT.dec()
+
+
+# PyMongo: command and pool-checkout timing through driver listeners; config.py passes them
+# to the client as event_listeners.
+class CommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        DB_QUERY_LATENCY.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        DB_QUERY_LATENCY.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    # Checkouts happen synchronously on the calling thread, so a thread-local start time is enough
+    def __init__(self):
+        self.local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self.local.start = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        DB_POOL_WAIT.observe(time.perf_counter() - self.local.start)
+
+    def connection_check_out_failed(self, event):
+        DB_POOL_WAIT.observe(time.perf_counter() - self.local.start)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
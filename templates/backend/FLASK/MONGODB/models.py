@@ -1,16 +1,13 @@
-from bson import ObjectId
+# Fields of each API object, in response order; "id" is the document's _id
+USER_FIELDS = ("id", "username", "email")
+NOTE_FIELDS = ("id", "title", "content")
 
-def serialize_user(doc):
-    return {
-        "id": str(doc.get("_id")),
-        "username": doc.get("username"),
-        "email": doc.get("email"),
-    }
 
+# _id stays an ObjectId here; the app's JSON provider (config.py) encodes it as a string.
+# fields narrows the object to a ?fields= selection (see projection.py).
+def serialize_user(doc, fields=USER_FIELDS):
+    return {field: doc.get("_id" if field == "id" else field) for field in fields}
 
-def serialize_note(doc):
-    return {
-        "id": str(doc.get("_id")),
-        "title": doc.get("title"),
-        "content": doc.get("content"),
-    }
+
+def serialize_note(doc, fields=NOTE_FIELDS):
+    return {field: doc.get("_id" if field == "id" else field) for field in fields}
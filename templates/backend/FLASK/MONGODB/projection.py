@@ -0,0 +1,18 @@
+from flask import request
+
+# Field selection: ?fields=id,username on the list and export routes returns only those fields.
+# They become a find() projection ({"_id": 1, "username": 1}), so MongoDB sends back only those
+# fields and less BSON is decoded per document. Without fields= whole documents are read.
+# id is always included: the next page cursor is built from it.
+def projection_args(allowed):
+    # Reads ?fields= from the current request: (fields to serialize, projection or None).
+    # Raises ValueError on unknown fields
+    fields = request.args.get("fields")
+    if not fields:
+        return allowed, None
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    selected = tuple(name for name in allowed if name == "id" or name in requested)
+    return selected, {"_id" if name == "id" else name: 1 for name in selected}
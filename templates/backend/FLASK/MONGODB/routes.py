@@ -1,7 +1,33 @@
-from flask import request, jsonify
-from MDB_config import app, db
-from models import serialize_user, serialize_note
+from flask import request, jsonify, Response, stream_with_context
+from config import app, db, read_db
+from models import USER_FIELDS, NOTE_FIELDS, serialize_user, serialize_note
+from bulk import MAX_BULK_ITEMS, bulk_insert, bulk_update, bulk_delete
+from cache import response_cache
+from metrics import CONTENT_TYPE_LATEST, render_metrics
+from pagination import ids_arg, order_by_ids, page_args, paginate
+from projection import projection_args
+from search import search_args, search_cursor, search_page
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+EXPORT_BATCH_SIZE = 1000
+
+# Streams a collection as NDJSON straight off the PyMongo cursor, flushing every EXPORT_BATCH_SIZE docs
+def export_ndjson(collection, serialize, fields, projection):
+    buffer = []
+    for doc in collection.find({}, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE):
+        buffer.append(app.json.dumps(serialize(doc, fields)) + "\n")
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+def check_bulk_payload(items):
+    if not isinstance(items, list) or not items:
+        return "Expected a non-empty JSON array"
+    if len(items) > MAX_BULK_ITEMS:
+        return f"At most {MAX_BULK_ITEMS} items per bulk request"
 
 @app.route("/autostack", methods=["GET"]) 
 def autostack():
@@ -12,12 +38,63 @@ def autostack():
 """
     return jsonify({"message": message, "backend": "Flask", "database": "MongoDB", "filepath": 'backend/main.py'}), 200
 
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    # Hit/miss counters of this worker process
+    return jsonify(response_cache.stats()), 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text format; merges all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set
+    return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
 # Example User REST APIs
 @app.route("/get-users", methods=["GET"])
 def get_users():
-    users = list(db.users.find())
-    json_users = [serialize_user(u) for u in users]
-    return jsonify({"users": json_users}), 200
+    try:
+        limit, last_id = page_args()
+        fields, projection = projection_args(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    query = {}
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+    users, next_cursor = paginate(list(read_db.users.find(query, projection).sort("_id", 1).limit(limit + 1)), limit, lambda d: d["_id"])
+    json_users = [serialize_user(u, fields) for u in users]
+    return jsonify({"users": json_users, "next_cursor": next_cursor}), 200
+
+@app.route("/export-users", methods=["GET"])
+def export_users():
+    try:
+        fields, projection = projection_args(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(stream_with_context(export_ndjson(read_db.users, serialize_user, fields, projection)), mimetype="application/x-ndjson")
+
+@app.route("/users/<user_id>", methods=["GET"])
+def get_user(user_id):
+    if not ObjectId.is_valid(user_id):
+        return jsonify({"message": "Invalid user id"}), 400
+
+    # find_one on _id is a point lookup on the default _id index
+    doc = db.users.find_one({"_id": ObjectId(user_id)})
+    if doc is None:
+        return jsonify({"message": "User not found"}), 404
+    return jsonify(serialize_user(doc)), 200
+
+@app.route("/users", methods=["GET"])
+def get_users_by_ids():
+    try:
+        user_ids = ids_arg()
+        fields, projection = projection_args(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # One {"_id": {"$in": [...]}} query for the whole batch; items come back in the order of ?ids=
+    docs = list(db.users.find({"_id": {"$in": user_ids}}, projection))
+    docs, missing = order_by_ids(user_ids, docs, lambda d: d["_id"])
+    return jsonify({"users": [serialize_user(d, fields) for d in docs], "missing": missing}), 200
 
 @app.route("/create-user", methods=["POST"])
 def create_user():
@@ -26,11 +103,11 @@ def create_user():
     if not username or not email:
         return jsonify({"message": "Missing fields"}), 400
 
-    # optional uniqueness check
-    if db.users.find_one({"$or": [{"username": username}, {"email": email}] } ): 
+    # uniqueness is enforced by the unique indexes created in config.ensure_indexes
+    try:
+        res = db.users.insert_one({"username": username, "email": email})
+    except DuplicateKeyError:
         return jsonify({"message": "User with same username or email already exists"}), 400
-
-    res = db.users.insert_one({"username": username, "email": email})
     return jsonify({"message": "New User Created", "id": str(res.inserted_id)}), 201
 
 
@@ -54,7 +131,10 @@ def update_user(user_id):
     if not update:
         return jsonify({"message": "No valid fields to update"}), 400
 
-    result = db.users.update_one({"_id": _id}, {"$set": update})
+    try:
+        result = db.users.update_one({"_id": _id}, {"$set": update})
+    except DuplicateKeyError:
+        return jsonify({"message": "User with same username or email already exists"}), 400
     if result.matched_count == 0:
         return jsonify({"message": "User not found"}), 404
 
@@ -75,12 +155,110 @@ def delete_user(user_id):
     return jsonify({"message": "User Deleted"}), 200
 
 
+# Bulk User APIs
+@app.route("/bulk/users", methods=["POST"])
+def bulk_create_users():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not item.get("username") or not item.get("email") for item in data):
+        return jsonify({"message": "Missing fields"}), 400
+
+    rows = [{"username": item["username"], "email": item["email"]} for item in data]
+    results = bulk_insert(db.users, rows)
+    return jsonify({"message": "Bulk Create Finished", "results": results}), 200
+
+
+@app.route("/bulk/users", methods=["PATCH"])
+def bulk_update_users():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not isinstance(item.get("id"), str) for item in data):
+        return jsonify({"message": "Missing or invalid user id"}), 400
+
+    rows = [
+        {"id": item["id"], **{key: item[key] for key in ("username", "email") if key in item}}
+        for item in data
+    ]
+    results = bulk_update(db.users, rows)
+    return jsonify({"message": "Bulk Update Finished", "results": results}), 200
+
+
+@app.route("/bulk/users", methods=["DELETE"])
+def bulk_delete_users():
+    ids = (request.json or {}).get("ids")
+    error = check_bulk_payload(ids)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(id_, str) for id_ in ids):
+        return jsonify({"message": "Missing or invalid user id"}), 400
+
+    results = bulk_delete(db.users, ids)
+    return jsonify({"message": "Bulk Delete Finished", "results": results}), 200
+
+
 # Example Notes REST APIs
 @app.route("/get-notes", methods=["GET"])
 def get_notes():
-    notes = list(db.notes.find())
-    json_notes = [serialize_note(n) for n in notes]
-    return jsonify({"notes": json_notes}), 200
+    try:
+        limit, last_id = page_args()
+        fields, projection = projection_args(NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    query = {}
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+    notes, next_cursor = paginate(list(read_db.notes.find(query, projection).sort("_id", 1).limit(limit + 1)), limit, lambda d: d["_id"])
+    json_notes = [serialize_note(n, fields) for n in notes]
+    return jsonify({"notes": json_notes, "next_cursor": next_cursor}), 200
+
+@app.route("/export-notes", methods=["GET"])
+def export_notes():
+    try:
+        fields, projection = projection_args(NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(stream_with_context(export_ndjson(read_db.notes, serialize_note, fields, projection)), mimetype="application/x-ndjson")
+
+@app.route("/search-notes", methods=["GET"])
+def search_notes():
+    # Ranked full-text search over title and content (see search.py)
+    try:
+        q, limit, offset = search_args()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    docs = list(search_cursor(read_db.notes, q, limit, offset))
+    notes, next_cursor = search_page(docs, q, limit, offset)
+    return jsonify({"notes": notes, "next_cursor": next_cursor}), 200
+
+@app.route("/notes/<note_id>", methods=["GET"])
+def get_note(note_id):
+    if not ObjectId.is_valid(note_id):
+        return jsonify({"message": "Invalid note id"}), 400
+
+    # find_one on _id is a point lookup on the default _id index
+    doc = db.notes.find_one({"_id": ObjectId(note_id)})
+    if doc is None:
+        return jsonify({"message": "Note not found"}), 404
+    return jsonify(serialize_note(doc)), 200
+
+@app.route("/notes", methods=["GET"])
+def get_notes_by_ids():
+    try:
+        note_ids = ids_arg()
+        fields, projection = projection_args(NOTE_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # One {"_id": {"$in": [...]}} query for the whole batch; items come back in the order of ?ids=
+    docs = list(db.notes.find({"_id": {"$in": note_ids}}, projection))
+    docs, missing = order_by_ids(note_ids, docs, lambda d: d["_id"])
+    return jsonify({"notes": [serialize_note(d, fields) for d in docs], "missing": missing}), 200
 
 @app.route("/create-note", methods=["POST"])
 def create_note():
@@ -89,10 +267,10 @@ def create_note():
     if not title or not content:
         return jsonify({"message": "Missing fields"}), 400
 
-    if db.notes.find_one({"title": title}):
+    try:
+        res = db.notes.insert_one({"title": title, "content": content})
+    except DuplicateKeyError:
         return jsonify({"message": "Note with same title already exists"}), 400
-
-    res = db.notes.insert_one({"title": title, "content": content})
     return jsonify({"message": "New Note Created", "id": str(res.inserted_id)}), 201
 
 
@@ -116,7 +294,10 @@ def update_note(note_id):
     if not update:
         return jsonify({"message": "No valid fields to update"}), 400
 
-    result = db.notes.update_one({"_id": _id}, {"$set": update})
+    try:
+        result = db.notes.update_one({"_id": _id}, {"$set": update})
+    except DuplicateKeyError:
+        return jsonify({"message": "Note with same title already exists"}), 400
     if result.matched_count == 0:
         return jsonify({"message": "Note not found"}), 404
 
@@ -135,3 +316,48 @@ def delete_note(note_id):
         return jsonify({"message": "Note not found"}), 404
 
     return jsonify({"message": "Note Deleted"}), 200
+
+
+# Bulk Note APIs
+@app.route("/bulk/notes", methods=["POST"])
+def bulk_create_notes():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not item.get("title") or not item.get("content") for item in data):
+        return jsonify({"message": "Missing fields"}), 400
+
+    rows = [{"title": item["title"], "content": item["content"]} for item in data]
+    results = bulk_insert(db.notes, rows)
+    return jsonify({"message": "Bulk Create Finished", "results": results}), 200
+
+
+@app.route("/bulk/notes", methods=["PATCH"])
+def bulk_update_notes():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not isinstance(item.get("id"), str) for item in data):
+        return jsonify({"message": "Missing or invalid note id"}), 400
+
+    rows = [
+        {"id": item["id"], **{key: item[key] for key in ("title", "content") if key in item}}
+        for item in data
+    ]
+    results = bulk_update(db.notes, rows)
+    return jsonify({"message": "Bulk Update Finished", "results": results}), 200
+
+
+@app.route("/bulk/notes", methods=["DELETE"])
+def bulk_delete_notes():
+    ids = (request.json or {}).get("ids")
+    error = check_bulk_payload(ids)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(id_, str) for id_ in ids):
+        return jsonify({"message": "Missing or invalid note id"}), 400
+
+    results = bulk_delete(db.notes, ids)
+    return jsonify({"message": "Bulk Delete Finished", "results": results}), 200
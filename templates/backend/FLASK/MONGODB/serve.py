@@ -0,0 +1,29 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# APP_ENV=development (default) runs the Werkzeug dev server with the reloader, like `python main.py`.
+# APP_ENV=production runs gunicorn with the settings in gunicorn.conf.py and N gthread workers.
+APP_ENV = os.getenv("APP_ENV", "development")
+PORT = int(os.getenv("PORT", "5000"))
+
+def run_development():
+    from main import app
+    from config import ensure_indexes
+    ensure_indexes()
+    app.run(debug=True, port=PORT)
+
+
+def run_production():
+    if sys.platform == "win32":
+        sys.exit("gunicorn does not run on Windows. Use WSL or a container for production.")
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"])
+
+
+if __name__ == "__main__":
+    if APP_ENV == "production":
+        run_production()
+    else:
+        run_development()
@@ -0,0 +1,264 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+from flask import Response, g, request
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Read-through cache for the read endpoints. init_cache() registers request hooks that keep the
+# JSON bodies of the GET routes in CACHED_READS, keyed by path and sorted query string, and serve
+# them with an ETag until they expire or a successful write to the same table invalidates them.
+# Invalidation bumps a per-table version that is part of every key, so stale entries are never
+# read again and just age out. CACHE_BACKEND=memory keeps entries and versions in each worker:
+# other workers may serve a stale page for up to CACHE_TTL seconds after a write.
+# CACHE_BACKEND=redis shares both between workers.
+#
+# init_conditional_get() is independent of the cache: it tags the same reads with a per-table
+# version token kept in the database and answers a matching If-None-Match with 304 from that
+# token alone, before the view queries or serializes anything.
+# The token costs one primary-key query per read, so it is off by default (CONDITIONAL_GET), and it
+# is checked behind the cache: a cache hit is served, or answered 304 by its own ETag, without
+# that query, and a table with no version row yet reads a fixed token instead of creating one.
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "none").lower()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_CONTROL = os.getenv("CACHE_CONTROL", "private, no-cache")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+KEY_PREFIX = "autostack"
+CONDITIONAL_GET = os.getenv("CONDITIONAL_GET", "false").lower() == "true"
+
+# GET routes whose responses are cached (and version-tagged), and the table each one reads.
+# A key ending in "/" stands for the single-item reads below it (/users/<id>).
+CACHED_READS = {
+    "/get-users": "users",
+    "/users": "users",
+    "/users/": "users",
+    "/get-notes": "notes",
+    "/notes": "notes",
+    "/notes/": "notes",
+    "/search-notes": "notes",
+}
+
+# Successful non-GET requests under these paths invalidate the table they write to
+WRITE_PREFIXES = {
+    "/create-user": "users",
+    "/update-users/": "users",
+    "/delete-user/": "users",
+    "/bulk/users": "users",
+    "/create-note": "notes",
+    "/update-notes/": "notes",
+    "/delete-note/": "notes",
+    "/bulk/notes": "notes",
+}
+
+
+def read_table(path):
+    # Two dict lookups: the path itself, then its parent for /users/<id>
+    return CACHED_READS.get(path) or CACHED_READS.get(path[:path.rfind("/") + 1])
+
+
+def written_table(path):
+    for prefix, table in WRITE_PREFIXES.items():
+        if path.startswith(prefix):
+            return table
+    return None
+
+
+class MemoryBackend:
+    # Per-process LRU of (value, expires_at) pairs; the least recently read entry is evicted first.
+    # The lock is needed because the development server and gthread workers serve requests on threads.
+    name = "memory"
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def version(self, table):
+        return self.versions.get(table, 0)
+
+    def bump(self, table):
+        with self.lock:
+            self.versions[table] = self.versions.get(table, 0) + 1
+
+
+class RedisBackend:
+    # Shared cache in Redis (or any server speaking its protocol); entries expire through SET EX
+    name = "redis"
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, value, ex=ttl)
+
+    def version(self, table):
+        return int(self.client.get(f"{KEY_PREFIX}:{table}:version") or 0)
+
+    def bump(self, table):
+        self.client.incr(f"{KEY_PREFIX}:{table}:version")
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def key(self, table, path, query_string):
+        # Sorting the parameters makes ?limit=10&cursor=x and ?cursor=x&limit=10 share an entry
+        query = urlencode(sorted(parse_qsl(query_string)))
+        version = self.backend.version(table)
+        return f"{KEY_PREFIX}:{table}:v{version}:{path}?{query}"
+
+    def get(self, key):
+        # Stored as b'<etag>\n<body>' so both backends keep a single value per key
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, body = value.split(b"\n", 1)
+        return etag.decode(), body
+
+    def set(self, key, body):
+        etag = make_etag(body)
+        self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+        return etag
+
+    def invalidate(self, table):
+        self.backend.bump(table)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.enabled else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def create_backend():
+    if CACHE_BACKEND == "memory":
+        return MemoryBackend(CACHE_MAX_ENTRIES)
+    if CACHE_BACKEND == "redis":
+        return RedisBackend(REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(create_backend(), CACHE_TTL)
+
+
+def cache_headers(response, etag, cache_status):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["X-Cache"] = cache_status
+    # Turns the response into a bodiless 304 when If-None-Match carries the same ETag
+    return response.make_conditional(request)
+
+
+def init_cache(app):
+    if not response_cache.enabled:
+        return
+
+    @app.before_request
+    def serve_cached_read():
+        table = read_table(request.path) if request.method == "GET" else None
+        if table is None:
+            return None
+        g.cache_key = response_cache.key(table, request.path, request.query_string.decode())
+        cached = response_cache.get(g.cache_key)
+        if cached is None:
+            return None
+        g.cache_hit = True
+        etag, body = cached
+        return cache_headers(Response(body, mimetype="application/json"), etag, "HIT")
+
+    @app.after_request
+    def fill_or_invalidate(response):
+        if request.method == "GET":
+            if "cache_key" not in g or g.get("cache_hit") or response.status_code != 200:
+                return response
+            etag = response_cache.set(g.cache_key, response.get_data())
+            return cache_headers(response, etag, "MISS")
+
+        table = written_table(request.path)
+        if table is not None and response.status_code < 400:
+            response_cache.invalidate(table)
+        return response
+
+
+def init_conditional_get(app, read_version, bump_version):
+    # read_version(table) and bump_version(table) are the database-specific functions from config.py.
+    # Register this after init_cache() so a cache hit is served without reading the version token.
+    if not CONDITIONAL_GET:
+        return
+
+    @app.before_request
+    def answer_not_modified():
+        table = read_table(request.path) if request.method == "GET" else None
+        if table is None:
+            return None
+        # Read before the view runs, so a response is never tagged newer than its rows
+        g.version_etag = read_version(table)
+        if not request.if_none_match.contains_weak(g.version_etag.strip('"')):
+            return None
+        response = Response(status=304)
+        response.headers["ETag"] = g.version_etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return response
+
+    @app.after_request
+    def tag_or_bump(response):
+        if request.method == "GET":
+            if "version_etag" in g and response.status_code == 200:
+                # Tags the view's 200 with the version token. With the response cache on, its after_request
+                # hook runs after this one and sets its own body-hash ETag in place of this one, and on a hit the
+                # token was never read, so clients see the version token only while the cache is off.
+                response.headers["ETag"] = g.version_etag
+                response.headers["Cache-Control"] = CACHE_CONTROL
+            return response
+
+        table = written_table(request.path)
+        if table is not None and response.status_code < 400:
+            bump_version(table)
+        return response
@@ -1,13 +1,49 @@
 from flask import Flask
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.pool import NullPool
 from flask_cors import CORS
 from dotenv import load_dotenv
+from cache import init_cache, init_conditional_get
+from metrics import TimedQueuePool, init_metrics, instrument_sqlalchemy
+from profiler import QUERY_PROFILER, init_profiler, profile_sqlalchemy
+from compression import init_compression
+from admission import init_admission
 import os
+import secrets
+import orjson
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+# Request count, latency and in-flight gauge for /metrics; registered before the cache hooks
+init_metrics(app)
+# Admission control and rate limits (ADMISSION_CONTROL / RATE_LIMITS in .env): sheds excess requests
+# with 503 / 429 before the hooks and views below touch the database
+init_admission(app)
+# Development query profiler (QUERY_PROFILER in .env): Server-Timing header and N+1 / slow query warnings
+init_profiler(app)
+# Response compression (COMPRESSION in .env); registered before the cache hooks so it runs after them
+init_compression(app)
+
+# Opt-in fast JSON: FAST_JSON=true swaps Flask's json module for orjson in jsonify and app.json
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+class ORJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+if FAST_JSON:
+    app.json = ORJSONProvider(app)
 
 # MySQL connection via environment variables. Example URI:
 # mysql+pymysql://<user>:<password>@<host>:<port>/<dbname>
@@ -17,8 +53,91 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "example_db")
 
-app.config['SQLALCHEMY_DATABASE_URI'] = (
+# DATABASE_URL, if set, replaces the DB_* settings (the bench/ stand-in points it at SQLite)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL") or (
     f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Connection pool tuning (see .env). pool_pre_ping costs a round trip on every checkout;
+# with DB_POOL_PRE_PING=false, pool_recycle alone guards against stale connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Set DB_EXTERNAL_POOL=true when an external pooler (e.g. ProxySQL) sits in front of the database.
+# SQLAlchemy then opens a connection per checkout (NullPool) and leaves pooling to it.
+DB_EXTERNAL_POOL = os.getenv("DB_EXTERNAL_POOL", "false").lower() == "true"
+
+if DB_EXTERNAL_POOL:
+    engine_options = {"poolclass": NullPool}
+else:
+    engine_options = {
+        "poolclass": TimedQueuePool,  # times pool checkouts for /metrics
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+# Statement count and latency for /metrics
+instrument_sqlalchemy()
+# Per-request statement counts and N+1 / slow query warnings in development (see profiler.py)
+if QUERY_PROFILER:
+    profile_sqlalchemy()
 db = SQLAlchemy(app)
+
+
+# One row per table; etag is replaced after every successful write (conditional GET, see cache.py)
+class TableVersion(db.Model):
+    __tablename__ = "table_version"
+
+    name = db.Column(db.String(40), primary_key=True)
+    etag = db.Column(db.String(64), nullable=False)
+
+def bump_version(table):
+    etag = f'"{table}-{secrets.token_hex(8)}"'
+    stmt = db.update(TableVersion).where(TableVersion.name == table).values(etag=etag)
+    if db.session.execute(stmt).rowcount == 0:
+        try:
+            db.session.execute(db.insert(TableVersion).values(name=table, etag=etag))
+        except IntegrityError:
+            # Another worker created the row first; overwrite its token instead
+            db.session.rollback()
+            db.session.execute(stmt)
+    db.session.commit()
+    return etag
+
+def read_version(table):
+    version = db.session.get(TableVersion, table)
+    # No row until the table's first write: a fixed token then, so a read never writes
+    return version.etag if version else f'"{table}-0"'
+
+# The schema is migrated once per deploy by migrate.py. Workers only check that the database is at
+# SCHEMA_REVISION, the newest revision in migrations/versions (bump it with every new migration;
+# migrate.py refuses to run while they disagree), with one SELECT and without importing Alembic.
+SCHEMA_REVISION = "0003"
+
+def schema_error():
+    with app.app_context(), db.engine.connect() as connection:
+        try:
+            current = connection.execute(db.text("SELECT version_num FROM alembic_version")).scalar()
+        except DBAPIError:
+            current = None  # no alembic_version table: never migrated
+    if current == SCHEMA_REVISION:
+        return None
+    return f"Database schema is at revision {current or 'none'}, this code needs {SCHEMA_REVISION}. Run `python migrate.py` first."
+
+def check_schema():
+    error = schema_error()
+    if error:
+        raise RuntimeError(error)
+
+# Response cache and conditional GET (CACHE_BACKEND / CONDITIONAL_GET in .env). The cache comes first
+# so a hit is served without reading the version token; CORS(app) was registered before both, so its
+# headers are still added to 304s and cached responses.
+init_cache(app)
+init_conditional_get(app, read_version, bump_version)
\ No newline at end of file
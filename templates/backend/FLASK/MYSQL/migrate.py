@@ -0,0 +1,23 @@
+import flask_migrate
+from config import SCHEMA_REVISION, app, db
+import models  # `flask --app migrate db migrate` compares these models with the database
+
+# Schema migrations run once per deploy, before any worker starts: `python migrate.py` (the same as
+# `flask --app migrate db upgrade`; serve.py runs it unless MIGRATE_ON_START=false). Flask-Migrate
+# is registered here rather than in config.py, so workers never import it or Alembic; their
+# startup check is config.check_schema.
+migrate = flask_migrate.Migrate(app, db)
+
+
+def upgrade():
+    from alembic.script import ScriptDirectory
+
+    with app.app_context():
+        head = ScriptDirectory.from_config(migrate.get_config()).get_current_head()
+        if head != SCHEMA_REVISION:
+            raise SystemExit(f"migrations/ ends at revision {head} but config.SCHEMA_REVISION is {SCHEMA_REVISION}; update it.")
+        flask_migrate.upgrade()
+
+
+if __name__ == "__main__":
+    upgrade()
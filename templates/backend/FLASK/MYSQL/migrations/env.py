@@ -0,0 +1,40 @@
+import logging
+from logging.config import fileConfig
+from flask import current_app
+from alembic import context
+
+config = context.config
+fileConfig(config.config_file_name)
+logger = logging.getLogger("alembic.env")
+
+migrate = current_app.extensions["migrate"]
+target_metadata = migrate.db.metadata
+
+
+def run_migrations_offline():
+    # flask db upgrade --sql: print the DDL instead of running it
+    url = migrate.db.engine.url.render_as_string(hide_password=False)
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    def process_revision_directives(context, revision, directives):
+        # Don't write an empty revision when `flask db migrate` finds no model changes
+        if getattr(config.cmd_opts, "autogenerate", False) and directives[0].upgrade_ops.is_empty():
+            directives[:] = []
+            logger.info("No changes in schema detected.")
+
+    configure_args = dict(migrate.configure_args)
+    configure_args.setdefault("process_revision_directives", process_revision_directives)
+    with migrate.db.engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, **configure_args)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
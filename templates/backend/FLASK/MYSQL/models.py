@@ -1,6 +1,9 @@
 from config import db
 
 class User(db.Model): 
+    # InnoDB stores rows in primary key order, so a keyset page (WHERE id > :cursor ORDER BY id)
+    # is already a range read of the clustered index; no extra index is needed for it.
+    # email's unique constraint is also the index lookups by email use.
     id = db.Column(db.Integer, primary_key = True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -14,9 +17,13 @@ class User(db.Model):
     
 
 class Note(db.Model): 
+    # /search-notes runs MATCH (title, content) AGAINST (...) on the InnoDB FULLTEXT index ix_note_fulltext
+    __table_args__ = (db.Index("ix_note_fulltext", "title", "content", mysql_prefix="FULLTEXT"),)
+
     id = db.Column(db.Integer, primary_key = True)
     title = db.Column(db.String(80), unique=True, nullable=False)
-    content = db.Column(db.String(120), unique=True, nullable=False)
+    # Free text: not unique and not B-tree indexed, a B-tree over it would only slow down every write
+    content = db.Column(db.Text, nullable=False)
 
     def to_json(self):
         return {
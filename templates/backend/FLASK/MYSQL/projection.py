@@ -0,0 +1,17 @@
+from flask import request
+
+# Field selection: ?fields=id,username on the list and export routes returns only those columns.
+# The routes select columns rather than entities (SELECT id, username FROM ...) and build each item
+# from the row, so no ORM objects are hydrated or tracked by the session. Without fields= every
+# column is selected. id is always included: the next page cursor is built from it.
+def column_args(model):
+    # Reads ?fields= from the current request. Raises ValueError on unknown fields
+    names = model.__table__.columns.keys()
+    fields = request.args.get("fields")
+    if fields:
+        requested = {name.strip() for name in fields.split(",")} - {""}
+        unknown = requested - set(names)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        names = [name for name in names if name == "id" or name in requested]
+    return [getattr(model, name) for name in names]
@@ -1,7 +1,27 @@
 
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from config import app, db
 from models import User, Note
+from bulk import MAX_BULK_ITEMS, bulk_insert, bulk_update, bulk_delete
+from cache import response_cache
+from metrics import CONTENT_TYPE_LATEST, render_metrics
+from pagination import ids_arg, order_by_ids, page_args, paginate, valid_id
+from projection import column_args
+from search import search_args, search_page, search_statement
+
+EXPORT_BATCH_SIZE = 1000
+
+# Streams the selected columns of a table as NDJSON over a server-side cursor, one chunk per yield_per batch
+def export_ndjson(model, columns):
+    rows = db.session.execute(db.select(*columns).order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for batch in rows.partitions():
+        yield "".join(app.json.dumps(row._asdict()) + "\n" for row in batch)
+
+def check_bulk_payload(items):
+    if not isinstance(items, list) or not items:
+        return "Expected a non-empty JSON array"
+    if len(items) > MAX_BULK_ITEMS:
+        return f"At most {MAX_BULK_ITEMS} items per bulk request"
 
 @app.route("/autostack", methods=["GET"]) 
 def autostack():
@@ -12,12 +32,60 @@ def autostack():
 """
     return jsonify({"message": message, "backend": "Flask", "database": "MySQL", "filepath": 'backend/main.py'}), 200
 
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    # Hit/miss counters of this worker process
+    return jsonify(response_cache.stats()), 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text format; merges all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set
+    return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
 # Example user REST APIs
 @app.route("/get-users", methods=["GET"])
 def get_users():
-    users = User.query.all()
-    json_users = list(map(lambda x: x.to_json(), users))
-    return jsonify({"users": json_users}), 200
+    try:
+        limit, last_id = page_args()
+        columns = column_args(User)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    query = db.select(*columns).order_by(User.id)
+    if last_id is not None:
+        query = query.where(User.id > last_id)
+    rows, next_cursor = paginate(db.session.execute(query.limit(limit + 1)).all(), limit, lambda x: x.id)
+    json_users = [row._asdict() for row in rows]
+    return jsonify({"users": json_users, "next_cursor": next_cursor}), 200
+
+@app.route("/export-users", methods=["GET"])
+def export_users():
+    try:
+        columns = column_args(User)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(stream_with_context(export_ndjson(User, columns)), mimetype="application/x-ndjson")
+
+@app.route("/users/<int:user_id>", methods=["GET"])
+def get_user(user_id):
+    # Primary key lookup: Session.get checks the identity map, then runs SELECT ... WHERE id = :id
+    user = db.session.get(User, user_id) if valid_id(user_id) else None
+    if user is None:
+        return jsonify({"message": "User not found"}), 404
+    return jsonify(user.to_json()), 200
+
+@app.route("/users", methods=["GET"])
+def get_users_by_ids():
+    try:
+        user_ids = ids_arg()
+        columns = column_args(User)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # One WHERE id IN (...) for the whole batch; items come back in the order of ?ids=
+    rows = db.session.execute(db.select(*columns).where(User.id.in_(user_ids))).all()
+    rows, missing = order_by_ids(user_ids, rows, lambda x: x.id)
+    return jsonify({"users": [row._asdict() for row in rows], "missing": missing}), 200
 
 @app.route("/create-user", methods=["POST"])
 def create_user():
@@ -39,46 +107,155 @@ def create_user():
 
 @app.route("/update-users/<int:user_id>", methods=["PATCH"])
 def update_user(user_id):
-    user = User.query.get(user_id)
-    if not user:
+    if not valid_id(user_id):
         return jsonify({"message": "User not found"}), 404
+
     data = request.json
     if not data:
         return jsonify({"message": "No data provided"}), 400
-    
+
+    update = {}
     if "username" in data:
-        user.username = data["username"]
+        update["username"] = data["username"]
     if "email" in data:
-        user.email = data["email"]
+        update["email"] = data["email"]
+
+    if not update:
+        return jsonify({"message": "No valid fields to update"}), 400
 
+    # Single UPDATE ... WHERE id = :id; rowcount tells us whether the row existed
     try:
+        result = db.session.execute(db.update(User).where(User.id == user_id).values(**update))
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
+    if result.rowcount == 0:
+        return jsonify({"message": "User not found"}), 404
+
     return jsonify({"message": "User Updated"}), 200
 
 
 @app.route("/delete-user/<int:user_id>", methods=["DELETE"])
 def delete_user(user_id):
-    user = User.query.get(user_id)
-    if not user:
+    if not valid_id(user_id):
         return jsonify({"message": "User not found"}), 404
+
     try:
-        db.session.delete(user)
+        result = db.session.execute(db.delete(User).where(User.id == user_id))
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
+    if result.rowcount == 0:
+        return jsonify({"message": "User not found"}), 404
+
     return jsonify({"message": "User Deleted"}), 200
 
 
+# Bulk User APIs
+@app.route("/bulk/users", methods=["POST"])
+def bulk_create_users():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not item.get("username") or not item.get("email") for item in data):
+        return jsonify({"message": "Missing fields"}), 400
+
+    rows = [{"username": item["username"], "email": item["email"]} for item in data]
+    results = bulk_insert(db.session, User, rows)
+    return jsonify({"message": "Bulk Create Finished", "results": results}), 200
+
+
+@app.route("/bulk/users", methods=["PATCH"])
+def bulk_update_users():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not isinstance(item.get("id"), int) for item in data):
+        return jsonify({"message": "Missing or invalid user id"}), 400
+
+    rows = [
+        {"id": item["id"], **{key: item[key] for key in ("username", "email") if key in item}}
+        for item in data
+    ]
+    results = bulk_update(db.session, User, rows)
+    return jsonify({"message": "Bulk Update Finished", "results": results}), 200
+
+
+@app.route("/bulk/users", methods=["DELETE"])
+def bulk_delete_users():
+    ids = (request.json or {}).get("ids")
+    error = check_bulk_payload(ids)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(id_, int) for id_ in ids):
+        return jsonify({"message": "Missing or invalid user id"}), 400
+
+    results = bulk_delete(db.session, User, ids)
+    return jsonify({"message": "Bulk Delete Finished", "results": results}), 200
+
+
 # Example Notes REST APIs
 @app.route("/get-notes", methods=["GET"])
 def get_notes():
-    notes = Note.query.all()
-    json_notes = list(map(lambda x: x.to_json(), notes))
-    return jsonify({"notes": json_notes}), 200
+    try:
+        limit, last_id = page_args()
+        columns = column_args(Note)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    query = db.select(*columns).order_by(Note.id)
+    if last_id is not None:
+        query = query.where(Note.id > last_id)
+    rows, next_cursor = paginate(db.session.execute(query.limit(limit + 1)).all(), limit, lambda x: x.id)
+    json_notes = [row._asdict() for row in rows]
+    return jsonify({"notes": json_notes, "next_cursor": next_cursor}), 200
+
+@app.route("/export-notes", methods=["GET"])
+def export_notes():
+    try:
+        columns = column_args(Note)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(stream_with_context(export_ndjson(Note, columns)), mimetype="application/x-ndjson")
+
+@app.route("/search-notes", methods=["GET"])
+def search_notes():
+    # Ranked full-text search over title and content (see search.py)
+    try:
+        q, limit, offset = search_args()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    rows = db.session.execute(search_statement(q, limit, offset)).all()
+    notes, next_cursor = search_page(rows, q, limit, offset)
+    return jsonify({"notes": notes, "next_cursor": next_cursor}), 200
+
+@app.route("/notes/<int:note_id>", methods=["GET"])
+def get_note(note_id):
+    # Primary key lookup: Session.get checks the identity map, then runs SELECT ... WHERE id = :id
+    note = db.session.get(Note, note_id) if valid_id(note_id) else None
+    if note is None:
+        return jsonify({"message": "Note not found"}), 404
+    return jsonify(note.to_json()), 200
+
+@app.route("/notes", methods=["GET"])
+def get_notes_by_ids():
+    try:
+        note_ids = ids_arg()
+        columns = column_args(Note)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # One WHERE id IN (...) for the whole batch; items come back in the order of ?ids=
+    rows = db.session.execute(db.select(*columns).where(Note.id.in_(note_ids))).all()
+    rows, missing = order_by_ids(note_ids, rows, lambda x: x.id)
+    return jsonify({"notes": [row._asdict() for row in rows], "missing": missing}), 200
 
 @app.route("/create-note", methods=["POST"])
 def create_note():
@@ -100,36 +277,94 @@ def create_note():
 
 @app.route("/update-notes/<int:note_id>", methods=["PATCH"])
 def update_note(note_id):
-    note = Note.query.get(note_id)
-    if not note:
+    if not valid_id(note_id):
         return jsonify({"message": "Note not found"}), 404
+
     data = request.json
-    
     if not data:
-        return jsonify({"message": "No data provided for updation"})
-    
+        return jsonify({"message": "No data provided for updation"}), 400
+
+    update = {}
     if "title" in data:
-        note.title = data["title"]
+        update["title"] = data["title"]
     if "content" in data:
-        note.content = data["content"]
+        update["content"] = data["content"]
 
+    if not update:
+        return jsonify({"message": "No valid fields to update"}), 400
+
+    # Single UPDATE ... WHERE id = :id; rowcount tells us whether the row existed
     try:
+        result = db.session.execute(db.update(Note).where(Note.id == note_id).values(**update))
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
-    return jsonify({"message": "User Updated"}), 200
+    if result.rowcount == 0:
+        return jsonify({"message": "Note not found"}), 404
+
+    return jsonify({"message": "Note Updated"}), 200
 
 
 @app.route("/delete-note/<int:note_id>", methods=["DELETE"])
 def delete_note(note_id):
-    note = Note.query.get(note_id)
-    if not note:
+    if not valid_id(note_id):
         return jsonify({"message": "Note not found"}), 404
+
     try:
-        db.session.delete(note)
+        result = db.session.execute(db.delete(Note).where(Note.id == note_id))
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
+    if result.rowcount == 0:
+        return jsonify({"message": "Note not found"}), 404
+
     return jsonify({"message": "Note Deleted"}), 200
+
+
+# Bulk Note APIs
+@app.route("/bulk/notes", methods=["POST"])
+def bulk_create_notes():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not item.get("title") or not item.get("content") for item in data):
+        return jsonify({"message": "Missing fields"}), 400
+
+    rows = [{"title": item["title"], "content": item["content"]} for item in data]
+    results = bulk_insert(db.session, Note, rows)
+    return jsonify({"message": "Bulk Create Finished", "results": results}), 200
+
+
+@app.route("/bulk/notes", methods=["PATCH"])
+def bulk_update_notes():
+    data = request.json
+    error = check_bulk_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(item, dict) or not isinstance(item.get("id"), int) for item in data):
+        return jsonify({"message": "Missing or invalid note id"}), 400
+
+    rows = [
+        {"id": item["id"], **{key: item[key] for key in ("title", "content") if key in item}}
+        for item in data
+    ]
+    results = bulk_update(db.session, Note, rows)
+    return jsonify({"message": "Bulk Update Finished", "results": results}), 200
+
+
+@app.route("/bulk/notes", methods=["DELETE"])
+def bulk_delete_notes():
+    ids = (request.json or {}).get("ids")
+    error = check_bulk_payload(ids)
+    if error:
+        return jsonify({"message": error}), 400
+    if any(not isinstance(id_, int) for id_ in ids):
+        return jsonify({"message": "Missing or invalid note id"}), 400
+
+    results = bulk_delete(db.session, Note, ids)
+    return jsonify({"message": "Bulk Delete Finished", "results": results}), 200
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# APP_ENV=development (default) runs the Werkzeug dev server with the reloader, like `python main.py`.
+# APP_ENV=production runs gunicorn with the settings in gunicorn.conf.py and N gthread workers.
+APP_ENV = os.getenv("APP_ENV", "development")
+PORT = int(os.getenv("PORT", "5000"))
+
+MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "true").lower() == "true"
+
+def run_migrations():
+    # Once, before any server process starts, and in a child process so that neither this process
+    # nor the gunicorn master it becomes holds on to the migration's connections (see migrate.py)
+    if subprocess.run([sys.executable, "migrate.py"]).returncode != 0:
+        sys.exit("Migrations failed; the server was not started.")
+
+
+def run_development():
+    from main import app
+    from config import check_schema
+    check_schema()
+    app.run(debug=True, port=PORT)
+
+
+def run_production():
+    if sys.platform == "win32":
+        sys.exit("gunicorn does not run on Windows. Use WSL or a container for production.")
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"])
+
+
+if __name__ == "__main__":
+    if MIGRATE_ON_START:
+        run_migrations()
+    if APP_ENV == "production":
+        run_production()
+    else:
+        run_development()
@@ -2,6 +2,7 @@ from config import app, db
 from routes import *
 
 if __name__ == "__main__":
-    # with app.app_context(): // Uncomment this after your database is ready to connect 
-    #     db.create_all()
+    # Workers don't create tables: run `python migrate.py` (flask --app migrate db upgrade) first
+    from config import check_schema
+    check_schema()
     app.run(debug=True, port=5000)
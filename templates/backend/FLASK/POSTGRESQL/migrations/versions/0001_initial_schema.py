@@ -0,0 +1,52 @@
+"""initial schema
+
+The tables as db.create_all() built them before migrations. A database created
+that way already has them: mark it with `flask --app migrate db stamp 0001`, then
+`flask --app migrate db upgrade`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(80), nullable=False),
+        sa.Column("email", sa.String(120), nullable=False),
+        sa.UniqueConstraint("username", name="user_username_key"),
+        sa.UniqueConstraint("email", name="user_email_key"),
+    )
+
+    op.create_table(
+        "note",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(80), nullable=False),
+        sa.Column("content", sa.String(120), nullable=False),
+        sa.UniqueConstraint("title", name="note_title_key"),
+        sa.UniqueConstraint("content", name="note_content_key"),
+    )
+
+    op.create_table(
+        "table_version",
+        sa.Column("name", sa.String(40), primary_key=True),
+        sa.Column("etag", sa.String(64), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("table_version")
+    op.drop_table("note")
+    op.drop_table("user")
@@ -0,0 +1,40 @@
+"""full-text search over notes
+
+- note.search_vector: stored generated tsvector of title (weight A) and content (weight B)
+- ix_note_search: GIN index over it, used by /search-notes
+
+Adding the column rewrites the note table once to fill it, under an exclusive lock; on a large
+table run this in a quiet window.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', content), 'B')"
+
+
+def upgrade():
+    # SQLite (bench --stand-in) has no tsvector; /search-notes needs PostgreSQL
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.add_column("note", sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)))
+    op.create_index("ix_note_search", "note", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade():
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_note_search", table_name="note")
+    op.drop_column("note", "search_vector")
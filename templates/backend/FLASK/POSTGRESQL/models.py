@@ -1,6 +1,12 @@
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from config import db
 
 class User(db.Model):
+    # Keyset pages (WHERE id > :cursor ORDER BY id) walk the primary key. ix_user_keyset carries
+    # username and email as INCLUDE columns, so PostgreSQL can serve a page from the index alone.
+    # email's unique constraint is also the index lookups by email use.
+    __table_args__ = (db.Index("ix_user_keyset", "id", postgresql_include=["username", "email"]),)
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -14,9 +20,21 @@ class User(db.Model):
 
 
 class Note(db.Model):
+    # /search-notes matches search_vector through the GIN index ix_note_search. PostgreSQL keeps the
+    # column up to date from title (weight A) and content (weight B) on every write. It is deferred,
+    # so loading a Note never reads it, and eager_defaults is off, so inserts and updates don't
+    # RETURN it either.
+    __table_args__ = (db.Index("ix_note_search", "search_vector", postgresql_using="gin"),)
+    __mapper_args__ = {"eager_defaults": False}
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(80), unique=True, nullable=False)
-    content = db.Column(db.String(120), unique=True, nullable=False)
+    # Free text: not unique and not B-tree indexed, a B-tree over it would only slow down every write
+    content = db.Column(db.Text, nullable=False)
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', content), 'B')",
+        persisted=True,
+    )))
 
     def to_json(self):
         return {
@@ -0,0 +1,70 @@
+import base64
+import binascii
+from flask import request
+
+# Keyset pagination: clients pass back the opaque cursor from the previous page
+# and we resume with "WHERE id > last_id ORDER BY id", so every page is an index range scan.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# id columns are INTEGER (32-bit signed in PostgreSQL and MySQL). A larger number can match no row,
+# and the driver would fail on it instead of answering, so the routes check ids against this first.
+MAX_ID = 2**31 - 1
+
+def valid_id(value):
+    return 0 < value <= MAX_ID
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        last_id = int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if not valid_id(last_id):
+            raise ValueError
+        return last_id
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+# Reads ?limit=&cursor= from the current request. Raises ValueError on bad input
+def page_args():
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE), decode_cursor(request.args.get("cursor"))
+
+
+# Reads ?ids=3,1,2 (batch reads) from the current request: at most MAX_PAGE_SIZE ids, repeats
+# dropped, in the order they were asked for. Raises ValueError on bad input
+def ids_arg():
+    ids = request.args.get("ids")
+    if not ids:
+        raise ValueError("ids is required")
+    try:
+        values = [int(value) for value in ids.split(",")]
+        if not all(valid_id(value) for value in values):
+            raise ValueError
+    except ValueError:
+        raise ValueError("Invalid id")
+    if len(values) > MAX_PAGE_SIZE:
+        raise ValueError(f"At most {MAX_PAGE_SIZE} ids per request")
+    return list(dict.fromkeys(values))
+
+
+# Rows are fetched with limit + 1 so we know whether another page exists without a COUNT query
+def paginate(rows, limit, key):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(key(rows[-1]))
+    return rows, None
+
+
+# Lines the rows of WHERE id IN (...) up with the requested ids: (rows, missing ids)
+def order_by_ids(ids, items, key):
+    by_id = {key(item): item for item in items}
+    return [by_id[id_] for id_ in ids if id_ in by_id], [id_ for id_ in ids if id_ not in by_id]
@@ -0,0 +1,71 @@
+import base64
+import binascii
+from flask import request
+from sqlalchemy import func, select
+from models import Note
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor
+
+# Full-text search for /search-notes over note.search_vector and its GIN index (see models.py).
+# websearch_to_tsquery takes what people type into a search box (words, "quoted phrases", OR,
+# -excluded words) and stems it with the same english configuration as the indexed text.
+# ts_headline builds the snippet from content; it re-parses the text, so it only runs on the rows
+# of the page, after ranking and LIMIT. The snippet is the note's own text with <mark> around the
+# matches and is not HTML-escaped.
+#
+# Results are ordered by rank, which no index holds: each page ranks every match and keeps the
+# best ones, so the cursor is an offset and pages stop at MAX_SEARCH_OFFSET. A selective query
+# costs the same on a large table as on a small one; a word found in most notes ranks most of them.
+SEARCH_CONFIG = "english"
+MAX_QUERY_LENGTH = 200
+MAX_SEARCH_OFFSET = 1000
+SNIPPET_OPTIONS = "MaxWords=30, MinWords=10, MaxFragments=2, StartSel=<mark>, StopSel=</mark>"
+
+
+def decode_offset(cursor):
+    if not cursor:
+        return 0
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, binascii.Error):
+        offset = -1
+    if not 0 <= offset <= MAX_SEARCH_OFFSET:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+# Reads ?q=&limit=&cursor= from the current request. Raises ValueError on bad input
+def search_args():
+    q = request.args.get("q", "").strip()
+    if not q:
+        raise ValueError("q is required")
+    if len(q) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q is limited to {MAX_QUERY_LENGTH} characters")
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return q, min(limit, MAX_PAGE_SIZE), decode_offset(request.args.get("cursor"))
+
+
+def search_statement(q, limit, offset):
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank(Note.search_vector, query)
+    page = (
+        select(Note.id, Note.title, Note.content, rank.label("rank"))
+        .where(Note.search_vector.op("@@")(query))
+        .order_by(rank.desc(), Note.id)
+        .offset(offset)
+        .limit(limit + 1)
+        .subquery()
+    )
+    snippet = func.ts_headline(SEARCH_CONFIG, page.c.content, query, SNIPPET_OPTIONS)
+    return select(page.c.id, page.c.title, snippet.label("snippet"), page.c.rank).order_by(page.c.rank.desc(), page.c.id)
+
+
+# Rows are fetched with limit + 1, like the list routes, to know whether another page exists
+def search_page(rows, limit, offset):
+    results = [
+        {"id": row.id, "title": row.title, "snippet": row.snippet, "rank": row.rank}
+        for row in rows[:limit]
+    ]
+    more = len(rows) > limit and offset + limit <= MAX_SEARCH_OFFSET
+    return results, encode_cursor(offset + limit) if more else None
@@ -0,0 +1,3 @@
+# Benchmarks for the generated backend, each with --help: python -m bench (load), python -m bench.concurrency
+# (throughput by requests in flight), python -m bench.startup (cold start), python -m bench.search
+# (full-text search latency by table size) and python -m bench.serialize (FastAPI response serializers)
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import httpx
+from bench.load import MIXES, Workload, run, seed
+from bench.stats import Stats
+
+# Load test for this backend. Run from the backend directory:
+#
+#   python -m bench --stand-in                     # SQLite / mongomock, no database server needed
+#   python -m bench --url http://localhost:8000    # a server you started, e.g. against a DB container
+#
+# Seeds --users users and --notes notes through the bulk routes, drives the CRUD routes with
+# --concurrency in-flight requests for --duration seconds (after --warmup seconds that are not
+# recorded) and prints throughput and p50/p95/p99 latency per route as JSON.
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stand_in(port, db_path, server="dev", db_latency_ms=0):
+    return subprocess.Popen([
+        sys.executable, "-m", "bench.standin", "--port", str(port), "--db-path", str(db_path),
+        "--server", server, "--db-latency-ms", str(db_latency_ms),
+    ])
+
+
+async def wait_until_ready(client, server, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        if server is not None and server.poll() is not None:
+            raise SystemExit(f"Stand-in server exited with code {server.returncode}")
+        try:
+            response = await client.get("/get-users", params={"limit": 1})
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise SystemExit(f"{client.base_url} did not answer /get-users within {timeout}s")
+        await asyncio.sleep(0.2)
+
+
+async def benchmark(args, base_url, server=None):
+    workload = Workload(secrets.token_hex(4), random.Random(args.seed))
+    mix = MIXES[args.mix]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await wait_until_ready(client, server, args.startup_timeout)
+        await seed(client, workload, args.users, args.notes)
+        seeded = {"users": len(workload.user_ids), "notes": len(workload.note_ids)}
+        if args.warmup > 0:
+            await run(client, workload, mix, Stats(), args.concurrency, args.warmup)
+
+        stats = Stats()
+        elapsed = await run(client, workload, mix, stats, args.concurrency, args.duration, args.requests)
+
+    total, routes = stats.summary(elapsed)
+    report = {"target": "stand-in" if server is not None else base_url}
+    if server is not None:
+        report["stand_in"] = {"server": args.server, "db_latency_ms": args.db_latency_ms}
+    return {
+        **report,
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "seeded": seeded,
+        "total": total,
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Load test the AutoStack backend")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server")
+    target.add_argument("--stand-in", action="store_true", help="Serve this app on SQLite / mongomock")
+    parser.add_argument("--server", choices=["dev", "production"], default="dev",
+                        help="Stand-in server: dev, or one gunicorn worker from gunicorn.conf.py (default: dev)")
+    parser.add_argument("--db-latency-ms", type=float, default=0,
+                        help="Stand-in only: simulated database round trip per query (default: 0)")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed (default: 200)")
+    parser.add_argument("--notes", type=int, default=500, help="Notes to seed (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight (default: 16)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to measure (default: 10)")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds to run before measuring (default: 2)")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests, even before --duration")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed", help="Request mix (default: mixed)")
+    parser.add_argument("--seed", type=int, help="Random seed, for a repeatable request sequence")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--startup-timeout", type=float, default=30, help="Seconds to wait for the server (default: 30)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.stand_in:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_stand_in(port, Path(tmp) / "bench.db", args.server, args.db_latency_ms)
+            try:
+                report = asyncio.run(benchmark(args, f"http://127.0.0.1:{port}", server))
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                    server.wait()
+    else:
+        report = asyncio.run(benchmark(args, args.url.rstrip("/")))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import subprocess
+import tempfile
+from pathlib import Path
+import httpx
+from bench.__main__ import free_port, start_stand_in, wait_until_ready
+from bench.load import MIXES, Workload, run, seed
+from bench.stats import Stats
+
+# Concurrency sweep: the same request mix at increasing numbers of requests in flight, to see where
+# a worker stops gaining throughput and starts queueing. Run from the backend directory:
+#
+#   python -m bench.concurrency --stand-in --db-latency-ms 5    # one gunicorn worker, simulated DB
+#   python -m bench.concurrency --url http://localhost:5000     # a server you started
+#
+# Sync vs async: generate the project once per mode (Flask + MongoDB: Sync / Async; FastAPI + SQL:
+# Sync / Async engine) and run the same command in each. A sync worker levels off at its thread count
+# (GUNICORN_THREADS, or the FastAPI threadpool) because each thread waits out its database call; an
+# async worker keeps gaining until its CPU is busy. Without --db-latency-ms the stand-ins answer
+# in microseconds and both look CPU bound.
+
+
+async def sweep(args, base_url, server=None):
+    workload = Workload(secrets.token_hex(4), random.Random(args.seed))
+    mix = MIXES[args.mix]
+    top = max(args.levels)
+    limits = httpx.Limits(max_connections=top, max_keepalive_connections=top)
+    levels = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await wait_until_ready(client, server, args.startup_timeout)
+        await seed(client, workload, args.users, args.notes)
+        for concurrency in args.levels:
+            if args.warmup > 0:
+                await run(client, workload, mix, Stats(), concurrency, args.warmup)
+            stats = Stats()
+            elapsed = await run(client, workload, mix, stats, concurrency, args.duration)
+            total, _ = stats.summary(elapsed)
+            del total["statuses"]
+            levels.append({"concurrency": concurrency, **total})
+
+    report = {"target": "stand-in" if server is not None else base_url, "mix": args.mix}
+    if server is not None:
+        report["stand_in"] = {"server": args.server, "db_latency_ms": args.db_latency_ms}
+    report["levels"] = levels
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.concurrency", description="Throughput and latency by concurrency")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server")
+    target.add_argument("--stand-in", action="store_true", help="Serve this app on SQLite / mongomock")
+    parser.add_argument("--server", choices=["dev", "production"], default="production",
+                        help="Stand-in server: dev, or one gunicorn worker from gunicorn.conf.py (default: production)")
+    parser.add_argument("--db-latency-ms", type=float, default=5,
+                        help="Stand-in only: simulated database round trip per query (default: 5)")
+    parser.add_argument("--levels", type=lambda s: [int(n) for n in s.split(",")], default=[1, 4, 16, 64],
+                        help="Comma-separated requests in flight (default: 1,4,16,64)")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds to measure per level (default: 5)")
+    parser.add_argument("--warmup", type=float, default=1, help="Seconds to run before each level (default: 1)")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed", help="Request mix (default: mixed)")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed (default: 200)")
+    parser.add_argument("--notes", type=int, default=500, help="Notes to seed (default: 500)")
+    parser.add_argument("--seed", type=int, help="Random seed, for a repeatable request sequence")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--startup-timeout", type=float, default=30, help="Seconds to wait for the server (default: 30)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.stand_in:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_stand_in(port, Path(tmp) / "bench.db", args.server, args.db_latency_ms)
+            try:
+                report = asyncio.run(sweep(args, f"http://127.0.0.1:{port}", server))
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                    server.wait()
+    else:
+        report = asyncio.run(sweep(args, args.url.rstrip("/")))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
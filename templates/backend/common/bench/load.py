@@ -0,0 +1,179 @@
+import asyncio
+import time
+import httpx
+
+# Request mixes: route label -> relative weight. Labels are route templates, so every id a
+# request targets is reported under the same route.
+MIXES = {
+    "mixed": {
+        "GET /get-users": 30,
+        "GET /get-notes": 30,
+        "POST /create-user": 8,
+        "PATCH /update-users/{id}": 10,
+        "POST /create-note": 8,
+        "PATCH /update-notes/{id}": 10,
+        "DELETE /delete-note/{id}": 4,
+    },
+    "read": {
+        "GET /get-users": 50,
+        "GET /get-notes": 50,
+    },
+    # The read mix with ?fields= selection, as a dashboard listing ids and names would send it
+    "dashboard": {
+        "GET /get-users?fields=id,username": 50,
+        "GET /get-notes?fields=id,title": 50,
+    },
+    # Point and batch lookups by id, as a frontend resolving references would send them
+    "lookup": {
+        "GET /users/{id}": 40,
+        "GET /notes/{id}": 40,
+        "GET /users?ids=": 10,
+        "GET /notes?ids=": 10,
+    },
+    "write": {
+        "POST /create-user": 20,
+        "PATCH /update-users/{id}": 25,
+        "POST /create-note": 20,
+        "PATCH /update-notes/{id}": 25,
+        "DELETE /delete-note/{id}": 10,
+    },
+}
+
+LOOKUP_BATCH = 20  # ids per batch lookup
+BULK_CHUNK = 500  # items per /bulk/* request while seeding (the routes accept up to 1000)
+PAGE_SIZE = 500   # MAX_PAGE_SIZE of the list routes
+
+
+class Workload:
+    # Builds the requests of one run. Every row it creates is named bench-<run_id>-..., and it
+    # only ever updates or deletes those rows, so a run against a development database leaves
+    # the existing data alone.
+    def __init__(self, run_id, rng):
+        self.run_id = run_id
+        self.rng = rng
+        self.prefix = f"bench-{run_id}-"
+        self.counter = 0
+        self.user_ids = []
+        self.note_ids = []
+
+    def unique(self, kind):
+        self.counter += 1
+        return f"{self.prefix}{kind}{self.counter}"
+
+    def new_user(self):
+        username = self.unique("u")
+        return {"username": username, "email": f"{username}@example.com"}
+
+    def new_note(self):
+        title = self.unique("n")
+        return {"title": title, "content": f"{title} content"}
+
+    def batch(self, ids):
+        return ",".join(str(id_) for id_ in self.rng.sample(ids, min(LOOKUP_BATCH, len(ids))))
+
+    def request(self, label):
+        # (method, path, json body) for one request, or None when no seeded row is left to target
+        if label == "GET /get-users":
+            return "GET", "/get-users", None
+        if label == "GET /get-notes":
+            return "GET", "/get-notes", None
+        if label == "GET /get-users?fields=id,username":
+            return "GET", "/get-users?fields=id,username", None
+        if label == "GET /get-notes?fields=id,title":
+            return "GET", "/get-notes?fields=id,title", None
+        if label == "GET /users/{id}":
+            if not self.user_ids:
+                return None
+            return "GET", f"/users/{self.rng.choice(self.user_ids)}", None
+        if label == "GET /notes/{id}":
+            if not self.note_ids:
+                return None
+            return "GET", f"/notes/{self.rng.choice(self.note_ids)}", None
+        if label == "GET /users?ids=":
+            if not self.user_ids:
+                return None
+            return "GET", f"/users?ids={self.batch(self.user_ids)}", None
+        if label == "GET /notes?ids=":
+            if not self.note_ids:
+                return None
+            return "GET", f"/notes?ids={self.batch(self.note_ids)}", None
+        if label == "POST /create-user":
+            return "POST", "/create-user", self.new_user()
+        if label == "POST /create-note":
+            return "POST", "/create-note", self.new_note()
+        if label == "PATCH /update-users/{id}":
+            if not self.user_ids:
+                return None
+            return "PATCH", f"/update-users/{self.rng.choice(self.user_ids)}", {"username": self.unique("u")}
+        if label == "PATCH /update-notes/{id}":
+            if not self.note_ids:
+                return None
+            return "PATCH", f"/update-notes/{self.rng.choice(self.note_ids)}", {"content": self.unique("c")}
+        if label == "DELETE /delete-note/{id}":
+            if not self.note_ids:
+                return None
+            # Swap-remove a random id so each note is deleted once
+            i = self.rng.randrange(len(self.note_ids))
+            self.note_ids[i], self.note_ids[-1] = self.note_ids[-1], self.note_ids[i]
+            return "DELETE", f"/delete-note/{self.note_ids.pop()}", None
+        raise ValueError(f"Unknown route: {label}")
+
+
+async def seed(client, workload, users, notes):
+    # One /bulk/* request per BULK_CHUNK rows, then read the ids back through the list routes:
+    # the SQL bulk insert doesn't return them
+    for kind, count, make in (("users", users, workload.new_user), ("notes", notes, workload.new_note)):
+        for start in range(0, count, BULK_CHUNK):
+            items = [make() for _ in range(min(BULK_CHUNK, count - start))]
+            response = await client.post(f"/bulk/{kind}", json=items)
+            response.raise_for_status()
+    workload.user_ids = await collect_ids(client, "users", "username", workload.prefix)
+    workload.note_ids = await collect_ids(client, "notes", "title", workload.prefix)
+
+
+async def collect_ids(client, kind, field, prefix):
+    ids = []
+    cursor = None
+    while True:
+        params = {"limit": PAGE_SIZE, "fields": f"id,{field}"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"/get-{kind}", params=params)
+        response.raise_for_status()
+        page = response.json()
+        ids += [row["id"] for row in page[kind] if row[field].startswith(prefix)]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+async def run(client, workload, mix, stats, concurrency, duration, max_requests=None):
+    # `concurrency` workers share the client and each keeps one request in flight until the
+    # duration runs out or max_requests have been sent
+    labels = list(mix)
+    weights = list(mix.values())
+    deadline = time.perf_counter() + duration
+    sent = 0
+
+    async def worker():
+        nonlocal sent
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            sent += 1
+            label = workload.rng.choices(labels, weights)[0]
+            request = workload.request(label)
+            if request is None:
+                stats.record(label, None, "skipped")
+                await asyncio.sleep(0)
+                continue
+            method, path, body = request
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            stats.record(label, time.perf_counter() - start, status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+from pathlib import Path
+import httpx
+from bench.__main__ import wait_until_ready
+from bench.load import BULK_CHUNK
+from bench.stats import Stats
+
+# Full-text search benchmark: /search-notes latency while the notes table grows, to check that the
+# search index keeps a selective query flat. Run from the backend directory against a server you
+# started on a real database (the full-text index has no SQLite / mongomock stand-in):
+#
+#   python -m bench.search --url http://localhost:8000 --sizes 10000,100000,1000000
+#
+# Notes are added through /bulk/notes until the run has added each size, with content drawn from a
+# vocabulary of made-up words. --needles notes carry one extra word and are added first, so at every
+# size there are three queries: "selective" (the needle word: the same few matches at every size),
+# "common" (a vocabulary word, in about 1.5% of notes: its matches grow with the table) and "miss"
+# (a word in no note). Each is sent --queries times, one at a time, after --warmup unrecorded ones.
+# Notes already in the database count towards the table size but not towards --sizes.
+
+VOCABULARY_SIZE = 2000
+WORDS_PER_NOTE = 30
+SYLLABLES = ["ka", "lo", "mi", "nu", "pe", "ra", "si", "to", "vu", "ze", "bri", "dal", "fen", "gor", "hul", "jas"]
+LOAD_CONCURRENCY = 4  # /bulk/notes requests in flight while growing the table
+
+
+def vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+async def grow(client, make_note, start, stop):
+    # Adds notes start..stop-1 in BULK_CHUNK requests, LOAD_CONCURRENCY at a time
+    chunks = iter(range(start, stop, BULK_CHUNK))
+
+    async def worker():
+        for first in chunks:
+            items = [make_note(n) for n in range(first, min(first + BULK_CHUNK, stop))]
+            response = await client.post("/bulk/notes", json=items)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(LOAD_CONCURRENCY)))
+
+
+async def measure(client, queries, args):
+    stats = Stats()
+    matches = {}
+    for label, q in queries.items():
+        for i in range(args.warmup + args.queries):
+            started = time.perf_counter()
+            response = await client.get("/search-notes", params={"q": q, "limit": args.limit})
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            if i >= args.warmup:
+                stats.record(label, elapsed, response.status_code)
+        matches[label] = len(response.json()["notes"])
+
+    _, routes = stats.summary(0)
+    return {
+        label: {"matches": matches[label], **{k: v for k, v in route.items() if k.endswith("_ms")}}
+        for label, route in routes.items()
+    }
+
+
+async def sweep(args):
+    rng = random.Random(args.seed)
+    prefix = secrets.token_hex(4)
+    words = vocabulary(rng)
+    needle = f"needle{prefix}"
+    queries = {"selective": needle, "common": rng.choice(words), "miss": f"absent{prefix}"}
+
+    def make_note(n):
+        content = [rng.choice(words) for _ in range(WORDS_PER_NOTE)]
+        if n < args.needles:
+            content.insert(rng.randrange(WORDS_PER_NOTE), needle)
+        return {"title": f"{prefix}-search-{n}", "content": " ".join(content)}
+
+    levels = []
+    added = 0
+    async with httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=args.timeout) as client:
+        await wait_until_ready(client, None, args.startup_timeout)
+        for size in sorted(args.sizes):
+            started = time.perf_counter()
+            await grow(client, make_note, added, size)
+            load_s = round(time.perf_counter() - started, 1)
+            added = max(added, size)
+            levels.append({"notes_added": added, "load_s": load_s, **await measure(client, queries, args)})
+
+    return {"target": args.url, "needles": args.needles, "queries": queries, "levels": levels}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.search", description="Full-text search latency by table size")
+    parser.add_argument("--url", required=True, help="Base URL of a running server")
+    parser.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")], default=[10000, 100000, 1000000],
+                        help="Comma-separated notes to have added at each step (default: 10000,100000,1000000)")
+    parser.add_argument("--needles", type=int, default=20, help="Notes that match the selective query (default: 20)")
+    parser.add_argument("--queries", type=int, default=50, help="Measured requests per query and size (default: 50)")
+    parser.add_argument("--warmup", type=int, default=5, help="Unrecorded requests per query and size (default: 5)")
+    parser.add_argument("--limit", type=int, default=20, help="Results per page (default: 20)")
+    parser.add_argument("--seed", type=int, help="Random seed, for repeatable note content")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds (default: 60)")
+    parser.add_argument("--startup-timeout", type=float, default=30, help="Seconds to wait for the server (default: 30)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(asyncio.run(sweep(args)), indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
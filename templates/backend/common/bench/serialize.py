@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+import httpx
+from bench.stats import Stats
+
+# Response serialization benchmark for the FastAPI templates: one /get-users-shaped response of
+# --rows users, built by each serializer. Run from the backend directory; it needs no server or
+# database:
+#
+#   python -m bench.serialize --rows 10000
+#
+# The rows are SQLAlchemy result rows from an in-memory SQLite table (SQL templates) or documents
+# with ObjectIds as PyMongo decodes them (MongoDB), made once, so only the serialization differs:
+#   current          the previous route code: a dict per row, returned with response_model=dict
+#   current-orjson   the same with FAST_JSON=true (ORJSONResponse)
+#   pydantic         json_response with RESPONSE_SERIALIZER=pydantic (responses.py)
+#   msgspec          json_response with RESPONSE_SERIALIZER=msgspec
+# Each is a request to a small app in this process, so FastAPI's own handling of the returned value
+# is included; the paths take turns, and every body is checked against the current one.
+
+
+def user(n):
+    return {"username": f"user{n}", "email": f"user{n}@example.com"}
+
+
+def sql_rows(count):
+    from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+    table = Table("user", MetaData(), Column("id", Integer, primary_key=True), Column("username", String), Column("email", String))
+    engine = create_engine("sqlite://")
+    table.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(table), [user(n) for n in range(count)])
+        rows = connection.execute(select(table).order_by(table.c.id)).all()
+    return lambda: rows
+
+
+def mongo_documents(count):
+    # The serializers rename _id in place, so every request gets fresh copies (made before timing)
+    from bson import ObjectId
+    documents = [{"_id": ObjectId(), **user(n)} for n in range(count)]
+    return lambda: [dict(document) for document in documents]
+
+
+def build_app(sql, state):
+    from fastapi import FastAPI
+    from fastapi.responses import ORJSONResponse, Response
+    from responses import SERIALIZERS
+    from schemas import UserPage
+
+    def current_users():
+        if sql:
+            return [row._asdict() for row in state["content"]]
+        users = []
+        for doc in state["content"]:
+            doc["id"] = str(doc.pop("_id"))
+            users.append(doc)
+        return users
+
+    app = FastAPI()
+
+    @app.get("/current", response_model=dict)
+    def current():
+        return {"users": current_users(), "next_cursor": None}
+
+    @app.get("/current-orjson", response_model=dict, response_class=ORJSONResponse)
+    def current_orjson():
+        return {"users": current_users(), "next_cursor": None}
+
+    def typed(name):
+        def route():
+            body = SERIALIZERS[name](UserPage, {"users": state["content"], "next_cursor": None})
+            return Response(body, media_type="application/json")
+        app.add_api_route(f"/{name}", route, response_model=UserPage)
+
+    typed("pydantic")
+    typed("msgspec")
+    return app
+
+
+async def run(args):
+    sql = not any(driver in Path("config.py").read_text() for driver in ("pymongo", "motor"))
+    make_content = sql_rows(args.rows) if sql else mongo_documents(args.rows)
+    state = {}
+    paths = ["current", "current-orjson", "pydantic", "msgspec"]
+    transport = httpx.ASGITransport(app=build_app(sql, state))
+    stats = Stats()
+    expected = None
+    sizes = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(args.warmup + args.repeat):
+            for path in paths:
+                state["content"] = make_content()
+                started = time.perf_counter()
+                response = await client.get(f"/{path}")
+                elapsed = time.perf_counter() - started
+                response.raise_for_status()
+                if i == 0:
+                    body = response.json()
+                    expected = expected or body
+                    if body != expected:
+                        raise SystemExit(f"/{path} returned a different body than /current")
+                    sizes[path] = len(response.content)
+                if i >= args.warmup:
+                    stats.record(path, elapsed, response.status_code)
+
+    _, routes = stats.summary(0)
+    baseline = routes["current"]["p50_ms"]
+    return {
+        "database": "sql" if sql else "mongodb",
+        "rows": args.rows,
+        "paths": {
+            path: {
+                "p50_ms": routes[path]["p50_ms"],
+                "p95_ms": routes[path]["p95_ms"],
+                "speedup": round(baseline / routes[path]["p50_ms"], 2),
+                "body_bytes": sizes[path],
+            }
+            for path in paths
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.serialize", description="Response serialization time by serializer")
+    parser.add_argument("--rows", type=int, default=10000, help="Users in the response (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=30, help="Measured responses per serializer (default: 30)")
+    parser.add_argument("--warmup", type=int, default=3, help="Unrecorded responses per serializer (default: 3)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(asyncio.run(run(args)), indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
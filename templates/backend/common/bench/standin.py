@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+# Serves the app in the current directory with a local stand-in for its database, so the benchmark
+# runs without a database server. SQL templates get a SQLite file through DATABASE_URL; MongoDB
+# templates get mongomock (PyMongo) or mongomock-motor (Motor) patched in before config.py creates
+# its client. Started by `python -m bench --stand-in`; it needs the packages in bench/requirements.txt.
+#
+# --server dev (default) serves with the framework's own threaded / uvicorn server. --server production
+# runs one gunicorn worker with the settings in gunicorn.conf.py, so results are per production worker.
+# --db-latency-ms adds a simulated network round trip to every query and write: the stand-ins answer
+# in microseconds, which hides what happens to a worker while it waits on a real database.
+#
+# Stand-in numbers compare templates and releases with each other. For capacity planning, run the
+# production server (APP_ENV=production python serve.py) against a real database and use --url.
+
+# Stand-in methods that stand for one round trip each
+MONGO_METHODS = (
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many",
+    "delete_one", "delete_many", "bulk_write",
+)
+
+
+# mongomock's methods call each other (find_one calls find); only the outermost call on a thread waits
+waiting = threading.local()
+
+
+def blocking_wait(method, seconds):
+    # Sync drivers block the calling thread for the whole round trip
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if getattr(waiting, "active", False):
+            return method(*args, **kwargs)
+        waiting.active = True
+        try:
+            time.sleep(seconds)
+            return method(*args, **kwargs)
+        finally:
+            waiting.active = False
+    return wrapper
+
+
+def async_wait(method, seconds):
+    # Async drivers hand the event loop back to other requests while they wait
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return await method(*args, **kwargs)
+    return wrapper
+
+
+def add_latency(kind, seconds):
+    if kind == "motor":
+        import mongomock_motor
+        for name in MONGO_METHODS:
+            if name != "find":  # find() only builds the cursor; the round trip is when it is read
+                setattr(mongomock_motor.AsyncMongoMockCollection, name,
+                        async_wait(getattr(mongomock_motor.AsyncMongoMockCollection, name), seconds))
+        mongomock_motor.AsyncCursor.to_list = async_wait(mongomock_motor.AsyncCursor.to_list, seconds)
+        first_batch = mongomock_motor.AsyncCursor.next
+
+        async def next_with_latency(self):
+            if not self.__dict__.get("_waited"):
+                self.__dict__["_waited"] = True
+                await asyncio.sleep(seconds)
+            return await first_batch(self)
+        mongomock_motor.AsyncCursor.next = mongomock_motor.AsyncCursor.__anext__ = next_with_latency
+    elif kind == "pymongo":
+        import mongomock
+        for name in MONGO_METHODS:
+            setattr(mongomock.collection.Collection, name,
+                    blocking_wait(getattr(mongomock.collection.Collection, name), seconds))
+    elif kind == "sqlite+aiosqlite":
+        import aiosqlite
+        aiosqlite.Cursor.execute = async_wait(aiosqlite.Cursor.execute, seconds)
+        aiosqlite.Cursor.executemany = async_wait(aiosqlite.Cursor.executemany, seconds)
+    else:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        from sqlalchemy.engine.default import DefaultDialect
+        event.listen(Engine, "before_cursor_execute", lambda *args: time.sleep(seconds))
+        # pool_pre_ping's SELECT 1 skips the event above, but it is a round trip too
+        DefaultDialect.do_ping = blocking_wait(DefaultDialect.do_ping, seconds)
+
+
+def use_stand_in(db_path, db_latency=0):
+    # Returns True for a SQL template. Detected from config.py, which imports exactly one driver.
+    config = Path("config.py").read_text()
+    if "motor" in config:
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+        kind = "motor"
+    elif "pymongo" in config:
+        import mongomock
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+        kind = "pymongo"
+    else:
+        kind = "sqlite+aiosqlite" if "create_async_engine" in config else "sqlite"
+        os.environ["DATABASE_URL"] = f"{kind}:///{db_path}"
+    if db_latency:
+        add_latency(kind, db_latency)
+    return kind.startswith("sqlite")
+
+
+def serve_production(port):
+    # One gunicorn worker with gunicorn.conf.py: the stand-in database lives in this process
+    # (mongomock) or in one SQLite file, so more workers would not share their data
+    from gunicorn.app.base import Application
+
+    class StandInServer(Application):
+        def init(self, parser, opts, args):
+            return None
+
+        def load_config(self):
+            self.load_config_from_file("gunicorn.conf.py")
+            self.cfg.set("bind", [f"127.0.0.1:{port}"])
+            self.cfg.set("workers", 1)
+            self.cfg.set("accesslog", None)
+            self.cfg.set("preload_app", False)
+
+        def load(self):
+            from main import app
+            return app
+
+    StandInServer().run()
+
+
+def serve(port, sql, server="dev"):
+    if sql:
+        from migrate import upgrade
+        upgrade()
+    if server == "production":
+        serve_production(port)
+        return
+    from main import app
+
+    if hasattr(app, "wsgi_app"):  # Flask
+        import config
+        if hasattr(config, "ensure_indexes"):  # MongoDB, done by post_worker_init under gunicorn
+            config.ensure_indexes()
+        from werkzeug.serving import run_simple
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        run_simple("127.0.0.1", port, app, threaded=True)
+    else:  # FastAPI, or Quart in the async Flask template
+        import uvicorn
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the app on local database stand-ins")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--db-path", required=True, help="SQLite file for SQL templates")
+    parser.add_argument("--server", choices=["dev", "production"], default="dev")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="Simulated round trip per query")
+    args = parser.parse_args()
+
+    # The development profiler would add its own overhead to the results; export QUERY_PROFILER=true to keep it
+    os.environ.setdefault("QUERY_PROFILER", "false")
+    serve(args.port, use_stand_in(args.db_path, args.db_latency_ms / 1000), args.server)
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Cold start benchmark: how long a fresh interpreter takes to import the app, which every worker,
+# reload and scale-from-zero instance pays before its first request. Run from the backend directory:
+#
+#   python -m bench.startup                # imports main with the drivers in requirements.txt
+#   python -m bench.startup --stand-in     # SQLite / mongomock, when the drivers are not installed
+#
+# Each run is a new `python -X importtime -c "import main"`. The report has the median / min / max
+# time to import main, the wall time of a plain run (interpreter start included, no -X overhead), and
+# the direct imports of main and the packages that cost the most. The first run only writes the .pyc
+# files and is not counted. Compare reports before and after a dependency or import change.
+
+
+def import_command(module, stand_in, db_path):
+    code = f"import {module}"
+    if stand_in:
+        # Patched in first, like `python -m bench --stand-in` does. For MongoDB that imports the
+        # driver before main, so its time is left out of the report.
+        code = f"from bench.standin import use_stand_in; use_stand_in({str(db_path)!r}); {code}"
+    return [sys.executable, "-c", code]
+
+
+def parse_importtime(stderr, module):
+    # -X importtime prints one line per module after its own imports, indented by nesting depth:
+    #   import time: self [us] | cumulative | imported package
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, int(self_us), int(cumulative_us), name.strip()))
+
+    # The module's own line comes after everything it imported; those lines are the run back to the
+    # previous line at its depth
+    end = next((i for i, row in enumerate(rows) if row[0] == 0 and row[3] == module), None)
+    if end is None:
+        raise SystemExit(f"{module} was not imported; the run failed or it was already imported")
+    start = end
+    while start > 0 and rows[start - 1][0] > 0:
+        start -= 1
+
+    direct, packages = {}, defaultdict(int)
+    for depth, self_us, cumulative_us, name in rows[start:end + 1]:
+        if depth == 1:
+            direct[name] = cumulative_us
+        packages[name.split(".")[0]] += self_us
+    return rows[end][2], direct, packages
+
+
+def measure(command, env, module):
+    started = time.perf_counter()
+    subprocess.run(command, env=env, check=True)
+    wall = time.perf_counter() - started
+
+    traced = subprocess.run(command[:1] + ["-X", "importtime"] + command[1:], env=env, check=True,
+                            capture_output=True, text=True)
+    return wall, parse_importtime(traced.stderr, module)
+
+
+def top(totals, n):
+    # Median microseconds per name over the runs, largest first, in milliseconds
+    ranked = sorted(((statistics.median(values), name) for name, values in totals.items()), reverse=True)
+    return {name: round(us / 1000, 1) for us, name in ranked[:n]}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description="Measure the app's import time")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs (default: 5)")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--stand-in", action="store_true", help="Use SQLite / mongomock instead of the DB driver")
+    parser.add_argument("--top", type=int, default=10, help="Imports and packages to list (default: 10)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("QUERY_PROFILER", "false")
+    with tempfile.TemporaryDirectory() as tmp:
+        command = import_command(args.module, args.stand_in, Path(tmp) / "bench.db")
+        subprocess.run(command, env=env, check=True)  # writes __pycache__
+
+        walls, imports = [], []
+        direct, packages = defaultdict(list), defaultdict(list)
+        for _ in range(args.runs):
+            wall, (import_us, run_direct, run_packages) = measure(command, env, args.module)
+            walls.append(wall * 1000)
+            imports.append(import_us / 1000)
+            for name, us in run_direct.items():
+                direct[name].append(us)
+            for name, us in run_packages.items():
+                packages[name].append(us)
+
+    report = {
+        "module": args.module,
+        "stand_in": args.stand_in,
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "import_ms": {
+            "median": round(statistics.median(imports), 1),
+            "min": round(min(imports), 1),
+            "max": round(max(imports), 1),
+        },
+        "wall_ms": round(statistics.median(walls), 1),
+        "direct_imports_ms": top(direct, args.top),
+        "packages_ms": top(packages, args.top),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
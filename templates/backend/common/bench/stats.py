@@ -0,0 +1,52 @@
+import math
+from collections import Counter, defaultdict
+
+
+def percentile(values, p):
+    # Nearest-rank percentile of an already sorted list
+    if not values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[rank - 1]
+
+
+def to_ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class Stats:
+    # Latencies and status counts per route label. A status is the HTTP code, "error" for a
+    # request that failed without a response, or "skipped" when there was no row left to target.
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, label, seconds, status):
+        self.statuses[label][str(status)] += 1
+        if seconds is not None:
+            self.latencies[label].append(seconds)
+
+    def summary(self, elapsed):
+        routes = {
+            label: summarize(self.latencies[label], self.statuses[label], elapsed)
+            for label in sorted(self.statuses)
+        }
+        all_latencies = [seconds for latencies in self.latencies.values() for seconds in latencies]
+        all_statuses = sum(self.statuses.values(), Counter())
+        return summarize(all_latencies, all_statuses, elapsed), routes
+
+
+def summarize(latencies, statuses, elapsed):
+    values = sorted(latencies)
+    errors = sum(n for status, n in statuses.items() if status == "error" or (status.isdigit() and int(status) >= 400))
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "skipped": statuses.get("skipped", 0),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": to_ms(percentile(values, 50)),
+        "p95_ms": to_ms(percentile(values, 95)),
+        "p99_ms": to_ms(percentile(values, 99)),
+        "max_ms": to_ms(values[-1] if values else None),
+        "statuses": dict(sorted(statuses.items())),
+    }